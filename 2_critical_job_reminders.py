@@ -1,144 +1,127 @@
-import schedule
+"""
+Critical job reminders: pops an alert card and plays a chord at each job's
+reminder time.
+
+Usage:
+    python 2_critical_job_reminders.py                          # run for real
+    python 2_critical_job_reminders.py --simulate               # replay the next 7 days instantly
+    python 2_critical_job_reminders.py --simulate --start 2024-01-01 --days 14
+
+--simulate drives the scheduler with a virtual clock, with no sound and no
+windows, and prints every alert with the time it would fire.
+"""
+
+import argparse
 import time
 from datetime import datetime, timedelta
-import pyperclip
-from tkinter import Tk, Button, Label
-import csv
 
-print("Reminders console")
+from deadline_scheduler import DeadlineScheduler, VirtualClock
+from job_schedule import JOBS_FILE, JobScheduleWatcher
 
+parser = argparse.ArgumentParser(description="Critical job reminders")
+parser.add_argument("--simulate", action="store_true",
+                    help="Replay the schedule on a virtual clock, without sound or windows")
+parser.add_argument("--start", type=lambda s: datetime.strptime(s, "%Y-%m-%d"), default=None,
+                    help="Simulation start date YYYY-MM-DD (default: today)")
+parser.add_argument("--days", type=int, default=7, help="Days to simulate (default 7)")
+parser.add_argument("--jobs-file", default=JOBS_FILE, help=f"Job schedule file (default {JOBS_FILE})")
+args = parser.parse_args()
 
+print("Reminders console")
 
-def csv_to_jobs_dict(filepath):
-    """
-    Converts a tab-delimited file into a list of job dictionaries.
-    Handles multiple consecutive tabs by reducing them to a single tab.
-    
-    Args:
-        filepath (str): Path to the tab-delimited file
-        
-    Returns:
-        list: List of job dictionaries
-    """
-    jobs = []
-    
-    with open(filepath, 'r') as file:
-        # Skip header line
-        header = file.readline().strip()
-        
-        for line in file:
-            # Replace multiple consecutive tabs with a single tab
-            while '\t\t' in line:
-                line = line.replace('\t\t', '\t')
-            
-            # Split by tabs
-            fields = line.strip().split('\t')
-            
-            # Ensure we have at least 3 fields
-            if len(fields) >= 3:
-                job = {
-                    "name": fields[0].strip("\t").strip(" "),
-                    "start_time": fields[1].strip("\t").strip(" "),
-                    "end_time": fields[2].strip("\t").strip(" ")
-                }
-                print("Job:", job)
-                jobs.append(job)
-    
-    return jobs
-
-# Job data as lists (replace this with your data parsing if automated)
-jobs = [
-]
 
 
 ######################
 
+if args.simulate:
+    simulation_start = args.start or datetime.combine(datetime.now().date(), datetime.min.time())
+    scheduler = DeadlineScheduler(VirtualClock(simulation_start))
+else:
+    scheduler = DeadlineScheduler()
+
 # List of weekdays for scheduling mk_BATCH_END_EMAIL
 WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday']
 
-import numpy as np
-import sounddevice as sd
-from chord import play_chord
+fsus4_frequencies = [349.22, 466.16, 523.26]
+
 
+class SilentAlerts:
+    """Stands in for the alert window when simulating."""
 
-fsus4_frequencies = [349.22, 466.16, 523.26]
+    def show(self, job_name):
+        pass
 
 
+if args.simulate:
+    def play_chord(*args, **kwargs):
+        pass
+    alert_ui = SilentAlerts()
+else:
+    from alert_ui import AlertUI
+    from chord import play_chord
+    # Alert cards are opened by one long-lived UI thread, so the scheduler never waits on a window
+    alert_ui = AlertUI()
+
 # Function to display alert with a copy button
 def show_alert(job_name):
-    play_chord(fsus4_frequencies, duration=2, fade_duration=0.5)  # Play the chord with fades
-    root = Tk()
-    root.title("Job Alert")
-    root.geometry("300x100")
+    play_chord(fsus4_frequencies, duration=2, fade_duration=0.5, blocking=False)  # Play the chord with fades in the background
+    print(f"{scheduler.clock.now():%a %Y-%m-%d %H:%M}  {job_name}")
+    alert_ui.show(job_name)
+
+# Function to schedule job alerts
+def schedule_job_alert(job_name, alert_time, days=None, day_offset=0):
+    """
+    Schedules show_alert(job_name) at alert_time on the given days (every day if None).
+    day_offset moves the alert that many days past each listed day, for alerts
+    that land after midnight of the job's day.
+    """
+    return scheduler.every_day_at(alert_time, show_alert, job_name=job_name, days=days,
+                                  day_offset=day_offset, name=job_name)
+
+# Function to schedule the start and end alerts of one job from the CSV
+def schedule_csv_job(job):
+    """Schedules the start and end alerts of a job dict. Returns both scheduler jobs."""
+    job_name = job["name"]
+    # Parsing start and end times
+    start_time = datetime.strptime(job["start_time"], "%H:%M").time()
+    end_time = datetime.strptime(job["end_time"], "%H:%M").time()
     
-    # Ensure the window appears on top
-    root.attributes("-topmost", True)
-    root.lift()
-    root.focus_force()
-    print(job_name)
-    label = Label(root, text=f"{job_name}")
-    label.pack(pady=10)
+    # Alerts go off 5 minutes after the start and end, counted from the day the job starts
+    job_day = datetime.combine(datetime.min.date(), start_time)
+    alert_time_start = job_day + timedelta(minutes=5)
+    alert_time_end = datetime.combine(job_day.date(), end_time) + timedelta(minutes=5)
+    # If end_time is earlier than or equal to start_time, it's on the next day
+    if end_time <= start_time:
+        alert_time_end += timedelta(days=1)
     
-    def copy_to_clipboard():
-        pyperclip.copy(job_name)
-        root.destroy()
+    # Determine scheduling days
+    if job_name == "mk_BATCH_END_EMAIL":
+        # Schedule only on weekdays
+        days_to_schedule = WEEKDAYS
+    else:
+        # Schedule every day
+        days_to_schedule = None
     
-    copy_button = Button(root, text="Copy Job Name", command=copy_to_clipboard)
-    copy_button.pack(pady=5)
+    # Schedule the start alert
+    start_alert = schedule_job_alert(job_name, alert_time_start.time(), days=days_to_schedule,
+                                     day_offset=(alert_time_start.date() - job_day.date()).days)
     
-    root.mainloop()
-
-# Function to schedule job alerts
-def schedule_job_alert(job_name, alert_time, days=None):
-    alert_time_str = alert_time.strftime("%H:%M")
-    if days:
-        for day in days:
-            # Get the scheduling method based on day string
-            schedule_method = getattr(schedule.every(), day)
-            schedule_method.at(alert_time_str).do(show_alert, job_name=job_name)
-    else:
-        schedule.every().day.at(alert_time_str).do(show_alert, job_name=job_name)
+    # Schedule the end alert (on the following day when the job runs past midnight)
+    end_alert = schedule_job_alert(job_name, alert_time_end.time(), days=days_to_schedule,
+                                   day_offset=(alert_time_end.date() - job_day.date()).days)
+    return [start_alert, end_alert]
 
 # Function to process each job and schedule alerts
 def process_jobs(jobs):
-    now = datetime.now()
     for job in jobs:
-        job_name = job["name"]
-        # Parsing start and end times
-        start_time = datetime.strptime(job["start_time"], "%H:%M").time()
-        end_time = datetime.strptime(job["end_time"], "%H:%M").time()
-        
-        # Compute alert_time_start by adding 5 minutes
-        alert_time_start = datetime.combine(now.date(), start_time) + timedelta(minutes=5)
-        if alert_time_start <= now:
-            # If the alert time has already passed today, schedule for tomorrow
-            alert_time_start += timedelta(days=1)
-        
-        # Compute alert_time_end by adding 5 minutes
-        alert_time_end = datetime.combine(now.date(), end_time) + timedelta(minutes=5)
-        # If end_time is earlier than or equal to start_time, it's on the next day
-        if end_time <= start_time:
-            alert_time_end += timedelta(days=1)
-        if alert_time_end <= now:
-            # If the alert time has already passed today, schedule for tomorrow
-            alert_time_end += timedelta(days=1)
-        
-        # Determine scheduling days
-        if job_name == "mk_BATCH_END_EMAIL":
-            # Schedule only on weekdays
-            days_to_schedule = WEEKDAYS
-        else:
-            # Schedule every day
-            days_to_schedule = None
-        
-        # Schedule the start alert
-        schedule_job_alert(job_name, alert_time_start, days=days_to_schedule)
-        
-        # Schedule the end alert
-        schedule_job_alert(job_name, alert_time_end, days=days_to_schedule)
-
-# Initialize job scheduling
-process_jobs(jobs)
+        schedule_csv_job(job)
+
+# Load the critical job list and keep following edits to it while running
+jobs_watcher = JobScheduleWatcher(args.jobs_file, scheduler, schedule_csv_job)
+if args.simulate:
+    jobs_watcher.reload()
+else:
+    jobs_watcher.start()
 
 # =======================
 # New Scheduling Added Below
@@ -194,10 +177,16 @@ schedule_job_alert("SMDS_SLSINVUPD_W Finished, set SMDS_SLSINVUPD_D priority to
 # End of Additional Scheduling
 # =======================
 
-# Test the chord sound out:
-play_chord(fsus4_frequencies, duration=2, fade_duration=0.5)  # Play the chord with fades
+if args.simulate:
+    simulation_end = simulation_start + timedelta(days=args.days)
+    print(f"Simulating {simulation_start:%a %Y-%m-%d %H:%M} to {simulation_end:%a %Y-%m-%d %H:%M}")
+    started = time.perf_counter()
+    fired = scheduler.run_until(simulation_end)
+    print(f"{fired} alerts in {args.days} days, simulated in {(time.perf_counter() - started) * 1000:.1f} ms")
+else:
+    # Test the chord sound out:
+    play_chord(fsus4_frequencies, duration=2, fade_duration=0.5, blocking=False)  # Play the chord with fades
+
+    # Main loop: sleep until each alert is due
+    scheduler.run_forever()
 
-# Main loop to run scheduled tasks
-while True:
-    schedule.run_pending()
-    time.sleep(1)
@@ -0,0 +1,144 @@
+"""
+Job alert windows shown from one long-lived Tk thread.
+
+The UI thread owns a single hidden Tk root and opens a Toplevel "card" for each
+alert it takes off a thread-safe queue, so callers (the reminder scheduler)
+only enqueue and return. Cards stack down the screen; alerts that arrive
+together are batched into one card with a copy button per job.
+
+Can be imported:
+    from alert_ui import AlertUI
+    ui = AlertUI()
+    ui.show("Final pass prompt")     # returns at once
+"""
+
+import queue
+import threading
+from tkinter import Tk, Toplevel, Button, Frame, Label
+
+import pyperclip
+
+CARD_WIDTH = 300
+CARD_HEIGHT = 100
+BATCH_WIDTH = 420
+BATCH_ROW_HEIGHT = 40
+CARD_GAP = 10
+POLL_MS = 100
+
+
+class AlertUI:
+    """
+    Shows job alerts without blocking the caller.
+
+    Args:
+        title: Window title of each card.
+        left, top: Screen position of the first card; later cards stack below.
+    """
+
+    def __init__(self, title="Job Alert", left=40, top=40):
+        self.title = title
+        self.left = left
+        self.top = top
+        self._queue = queue.Queue()
+        self._cards = []
+        self._ready = threading.Event()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="alert-ui", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    def show(self, job_name):
+        """Queues an alert card for job_name and returns immediately."""
+        self._queue.put(job_name)
+
+    def close(self):
+        """Closes every card and stops the UI thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        # Every Tk call happens on this thread
+        try:
+            self.root = Tk()
+        except Exception as e:  # e.g. no display
+            self._error = e
+            self._ready.set()
+            return
+        self.root.withdraw()
+        self.root.after(POLL_MS, self._drain)
+        self._ready.set()
+        self.root.mainloop()
+        self.root.destroy()
+
+    def _drain(self):
+        job_names = []
+        while True:
+            try:
+                job_name = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job_name is None:
+                self.root.quit()
+                return
+            job_names.append(job_name)
+
+        if job_names:
+            # Several alerts due together share one card instead of a pile of windows
+            self._open_card(job_names)
+        self.root.after(POLL_MS, self._drain)
+
+    def _open_card(self, job_names):
+        card = Toplevel(self.root)
+        card.title(self.title if len(job_names) == 1 else f"{self.title}s ({len(job_names)})")
+        card.attributes("-topmost", True)
+        card.protocol("WM_DELETE_WINDOW", lambda: self._close_card(card))
+        card.rows = []
+
+        if len(job_names) == 1:
+            job_name = job_names[0]
+            Label(card, text=f"{job_name}").pack(pady=10)
+            Button(card, text="Copy Job Name",
+                   command=lambda: self._copy(card, None, job_name)).pack(pady=5)
+        else:
+            for job_name in job_names:
+                row = Frame(card)
+                row.pack(fill="x", padx=10, pady=4)
+                Label(row, text=f"{job_name}", anchor="w").pack(side="left", fill="x", expand=True)
+                Button(row, text="Copy",
+                       command=lambda row=row, job_name=job_name: self._copy(card, row, job_name)).pack(side="right")
+                card.rows.append(row)
+
+        self._cards.append(card)
+        self._restack()
+        # Ensure the window appears on top
+        card.lift()
+        card.focus_force()
+
+    def _copy(self, card, row, job_name):
+        pyperclip.copy(job_name)
+        if row is None:
+            self._close_card(card)
+            return
+        row.destroy()
+        card.rows.remove(row)
+        if not card.rows:
+            self._close_card(card)
+        else:
+            self._restack()
+
+    def _close_card(self, card):
+        card.destroy()
+        self._cards.remove(card)
+        self._restack()
+
+    def _restack(self):
+        top = self.top
+        for card in self._cards:
+            if card.rows:
+                width, height = BATCH_WIDTH, BATCH_ROW_HEIGHT * len(card.rows) + 20
+            else:
+                width, height = CARD_WIDTH, CARD_HEIGHT
+            card.geometry(f"{width}x{height}+{self.left}+{top}")
+            top += height + CARD_GAP
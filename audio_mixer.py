@@ -0,0 +1,206 @@
+"""
+One long-lived audio output stream shared by every sound in the process.
+
+Chords (chord.py), Strong Bad clips (random_sb_sound.py) and anything else
+hand NumPy buffers to the mixer, which sums all playing sounds in the
+sounddevice callback. The device is opened once per process instead of once
+per alert, and two alerts firing together both play instead of one waiting
+or failing.
+
+Each sound has its own volume and a priority. While a higher-priority sound
+plays, lower-priority ones are ducked to duck_level, and duck() lowers
+everything while something outside the mixer (e.g. text-to-speech) talks.
+
+Can be imported:
+    from audio_mixer import get_mixer, URGENT
+    voice = get_mixer().play(buffer, volume=0.5, sample_rate=44100)
+    voice.wait()                        # only if you want to block
+    with duck():
+        engine.runAndWait()
+"""
+
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+import sounddevice as sd
+
+# Lower numbers win; lower-priority sounds are ducked while a higher one plays
+URGENT = 0
+NORMAL = 5
+LOW = 9
+
+
+class Voice:
+    """
+    One sound playing (or queued to play) in the mixer.
+
+    Attributes:
+        volume: Gain applied to this sound; may be changed while it plays.
+        priority: URGENT, NORMAL, LOW or any int.
+        done: threading.Event set when the sound finished or was stopped.
+    """
+
+    def __init__(self, data, volume, priority):
+        self.data = data
+        self.volume = volume
+        self.priority = priority
+        self.position = 0
+        self.done = threading.Event()
+        self._scale = np.float32(1 / 32768) if data.dtype == np.int16 else np.float32(1)
+
+    def wait(self, timeout=None):
+        """Blocks until the sound has finished. Returns False on timeout."""
+        return self.done.wait(timeout)
+
+    def stop(self):
+        """Stops the sound at the next audio block."""
+        self.position = len(self.data)
+
+    def _read(self, frames, channels):
+        """Returns the next block as float32 (frames, channels), or None if finished."""
+        start = self.position
+        if start >= len(self.data):
+            return None
+        chunk = self.data[start:start + frames]
+        self.position = start + len(chunk)
+        block = np.asarray(chunk, dtype=np.float32) * self._scale
+        if block.ndim == 1:
+            block = block[:, np.newaxis]
+        if block.shape[1] != channels:
+            # Mono to all channels, or down-mix anything else
+            block = np.broadcast_to(block.mean(axis=1, keepdims=True), (len(block), channels))
+        return block
+
+
+class AudioMixer:
+    """
+    Mixes any number of buffers into one sounddevice.OutputStream.
+
+    Args:
+        sample_rate: Output rate; buffers at other rates are resampled on play().
+        channels: Output channel count.
+        blocksize: Frames per callback.
+        duck_level: Gain for ducked sounds.
+    """
+
+    def __init__(self, sample_rate=44100, channels=2, blocksize=1024, duck_level=0.3):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.duck_level = duck_level
+        self._voices = []
+        self._lock = threading.Lock()
+        self._external_ducks = 0
+        self._stream = sd.OutputStream(samplerate=sample_rate, channels=channels, dtype="float32",
+                                       blocksize=blocksize, callback=self._callback)
+        self._stream.start()
+
+    def play(self, data, volume=1.0, priority=NORMAL, sample_rate=None):
+        """
+        Starts playing a buffer and returns at once.
+
+        Args:
+            data: float32/float64 samples in [-1, 1] or int16 PCM, shaped
+                (frames,) or (frames, channels). Read in place, not copied,
+                when it is already at the mixer's sample rate.
+            volume: Gain for this sound.
+            priority: URGENT, NORMAL, LOW or any int.
+            sample_rate: The buffer's rate, if it differs from the mixer's.
+
+        Returns:
+            The Voice, for wait(), stop() or changing its volume.
+        """
+        data = np.asarray(data)
+        if sample_rate is not None and sample_rate != self.sample_rate:
+            data = _resample(data, sample_rate, self.sample_rate)
+        voice = Voice(data, volume, priority)
+        with self._lock:
+            self._voices.append(voice)
+        return voice
+
+    @contextmanager
+    def duck(self):
+        """Lowers every sound to duck_level for the duration of the block."""
+        with self._lock:
+            self._external_ducks += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._external_ducks -= 1
+
+    def stop_all(self):
+        with self._lock:
+            for voice in self._voices:
+                voice.stop()
+
+    def close(self):
+        self.stop_all()
+        self._stream.stop()
+        self._stream.close()
+
+    def _callback(self, outdata, frames, time_info, status):
+        outdata.fill(0)
+        with self._lock:
+            voices = list(self._voices)
+            external_duck = self._external_ducks > 0
+        if not voices:
+            return
+
+        top_priority = min(voice.priority for voice in voices)
+        finished = []
+        for voice in voices:
+            block = voice._read(frames, self.channels)
+            if block is None:
+                finished.append(voice)
+                continue
+            gain = voice.volume
+            if external_duck or voice.priority > top_priority:
+                gain *= self.duck_level
+            outdata[:len(block)] += block * np.float32(gain)
+            if voice.position >= len(voice.data):
+                finished.append(voice)
+
+        np.clip(outdata, -1.0, 1.0, out=outdata)
+        if finished:
+            with self._lock:
+                for voice in finished:
+                    if voice in self._voices:
+                        self._voices.remove(voice)
+            for voice in finished:
+                voice.done.set()
+
+
+def _resample(data, from_rate, to_rate):
+    """Linear resampling to the mixer rate (a copy, as float32)."""
+    scale = np.float32(1 / 32768) if data.dtype == np.int16 else np.float32(1)
+    frames = len(data)
+    new_frames = int(round(frames * to_rate / from_rate))
+    src = np.arange(new_frames) * (from_rate / to_rate)
+    old = np.arange(frames)
+    if data.ndim == 1:
+        return np.interp(src, old, data).astype(np.float32) * scale
+    return np.stack([np.interp(src, old, data[:, c]) for c in range(data.shape[1])], axis=1).astype(np.float32) * scale
+
+
+_mixer = None
+_mixer_lock = threading.Lock()
+
+
+def get_mixer():
+    """Returns the process-wide mixer, opening the output stream on first use."""
+    global _mixer
+    with _mixer_lock:
+        if _mixer is None:
+            _mixer = AudioMixer()
+        return _mixer
+
+
+@contextmanager
+def duck():
+    """Ducks the shared mixer if one is running; does nothing otherwise."""
+    if _mixer is None:
+        yield
+        return
+    with _mixer.duck():
+        yield
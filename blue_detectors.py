@@ -0,0 +1,196 @@
+"""
+Detectors for the Outlook blue watcher (4_watch_for_blue.py).
+
+Everything here works on screen_capture.Frame objects and NumPy arrays only,
+with no screen, mouse, keyboard or speech dependencies, so the detection
+pipeline can be replayed and benchmarked headless (see replay_blue_watcher.py).
+"""
+
+from flood_fill import magic_wand_select
+from palette import PaletteClassifier
+from template_match import LastPositionMatcher, templates
+
+# Unread message indicator colors (Outlook's blue unread badges); add colors here
+UNREAD_COLORS = [
+    (0, 90, 176),
+    (0, 90, 170),
+    (46, 90, 158)
+]
+unread_palette = PaletteClassifier(UNREAD_COLORS)
+
+# Remembers where the inbox button was last seen in each region; its hits/misses
+# counters show how often the O(template size) fast path answers the search
+inbox_matcher = LastPositionMatcher(radius=8)
+
+# Largest magic wand selection before the flood fill gives up (a uniform screen would select everything)
+MAGIC_WAND_MAX_PIXELS = 1_000_000
+
+
+def _get_selection_bounds(selection):
+    """
+    Gets the bounding rectangle of a magic wand selection.
+
+    Args:
+        selection: A flood_fill.Selection, or None.
+
+    Returns:
+        A tuple (min_x, min_y, max_x, max_y) or None if empty.
+    """
+    if selection is None:
+        return None
+
+    return selection.bounds
+
+
+def _check_for_unread_colors(screen_arr, bounds):
+    """
+    Checks if any unread message indicator colors exist within the given bounds.
+
+    Args:
+        screen_arr: The numpy array of the screen (RGB).
+        bounds: A tuple (min_x, min_y, max_x, max_y).
+
+    Returns:
+        True if unread message colors are found, False otherwise.
+    """
+    if bounds is None:
+        return False
+
+    min_x, min_y, max_x, max_y = bounds
+
+    # Extract the region
+    region = screen_arr[min_y:max_y+1, min_x:max_x+1]
+
+    # One pass over the region for all unread indicator colors
+    return unread_palette.any(region)
+
+# Most common background colors for inbox images (for magic wand selection)
+INBOX_BG_COLOR = (225, 225, 225)  # inbox.png background
+INBOX_HIGHLIGHTED_BG_COLOR = (205, 230, 247)  # inbox_highlighted.png background
+
+
+def inbox_button_exists(
+    frame,
+    region_top_left,
+    region_bottom_right,
+):
+    """
+    Checks for the presence of either an un-highlighted or highlighted inbox image
+    within a specified region of the screen using exact pixel matching.
+    When found, performs a magic wand selection from the center of the found image
+    on the full frame and checks for unread message indicator colors.
+
+    Args:
+        frame: The screen_capture.Frame for this tick.
+        region_top_left: A 2-tuple (x, y) of the top-left coordinates of the search area.
+        region_bottom_right: A 2-tuple (x, y) of the bottom-right coordinates of the search area.
+
+    Returns:
+        A tuple (found, has_unread):
+            - found: True if inbox image is found, False otherwise.
+            - has_unread: True if unread message colors detected in selection, False otherwise.
+    """
+
+    # 1. Define the screen region to search, in frame indexes
+    box = frame.clip(region_top_left, region_bottom_right)
+    if box is None:
+        print("Invalid search region. Make sure bottom-right is after top-left.")
+        return (False, False)
+    x1, y1, x2, y2 = box
+
+    # 2. The "haystack" is a view into the frame (no copy)
+    full_screen_arr = frame.rgb
+    haystack_arr = full_screen_arr[y1:y2, x1:x2]
+
+    # 3. Define the "needles" (the template images) with their background colors
+    image_configs = [
+        ('images/inbox.png', INBOX_BG_COLOR),
+        ('images/inbox_highlighted.png', INBOX_HIGHLIGHTED_BG_COLOR)
+    ]
+
+    # Try whichever needle matched last time first, so its fast path is hit
+    area = (tuple(region_top_left), tuple(region_bottom_right))
+    image_configs.sort(key=lambda config: config[0] != inbox_matcher.recent(area))
+
+    # 4. Loop through each needle and search for it
+    for path, bg_color in image_configs:
+        try:
+            # Get the preloaded needle image (RGB, alpha discarded)
+            template = templates.get(path)
+
+            # Find an exact match and get position, checking the last known position first
+            match_result = inbox_matcher.find(haystack_arr, template, area=area, return_position=True)
+
+            if match_result is not None:
+                match_x, match_y, match_w, match_h = match_result
+                print(f"Inbox found at region-relative position ({match_x}, {match_y})")
+
+                # Calculate the center of the found image in frame coordinates
+                center_x = x1 + match_x + match_w // 2
+                center_y = y1 + match_y + match_h // 2
+
+                # 5. Perform magic wand selection from the center using the background color
+                print(f"Performing magic wand selection at ({center_x}, {center_y}) with color {bg_color}")
+                selection = magic_wand_select(
+                    full_screen_arr,
+                    center_x,
+                    center_y,
+                    bg_color,
+                    max_pixels=MAGIC_WAND_MAX_PIXELS
+                )
+
+                if selection is None:
+                    print("Magic wand selection returned no pixels")
+                    return (True, False)
+
+                print(f"Magic wand selected {selection.count} pixels")
+                if selection.truncated:
+                    print(f"Magic wand selection stopped at the {MAGIC_WAND_MAX_PIXELS} pixel cap")
+
+                # 6. Get the bounding rectangle of the selection
+                bounds = _get_selection_bounds(selection)
+                if bounds:
+                    print(f"Selection bounds: {bounds}")
+
+                # 7. Check for unread message colors within the bounds
+                has_unread = _check_for_unread_colors(full_screen_arr, bounds)
+                if has_unread:
+                    print("Unread message indicator colors detected!")
+                else:
+                    print("No unread message indicators found in selection")
+
+                return (True, has_unread)
+
+        except FileNotFoundError:
+            print(f"Warning: Template image not found at {path}")
+            pass  # Try the next image
+        except Exception as e:
+            print(f"Error processing template image {path}: {e}")
+            pass  # Try the next image
+
+    # --- 5. Neither image was found ---
+    return (False, False)
+
+
+def count_blue_pixels(frame, top_left, bottom_right):
+    """
+    Counts the unread indicator pixels inside a region of the frame.
+
+    Args:
+        frame: The screen_capture.Frame for this tick.
+        top_left: A 2-tuple (x, y) of the top-left screen coordinates.
+        bottom_right: A 2-tuple (x, y) of the bottom-right screen coordinates.
+
+    Returns:
+        The number of pixels matching any color in UNREAD_COLORS.
+    """
+    # Crop the region out of this tick's frame (a view, no copy)
+    arr = frame.region(top_left, bottom_right)
+
+    if arr is None:
+        print("Invalid box dimensions. Make sure bottom-right is actually to the bottom-right of top-left.")
+        return 0
+
+    # Count how many pixels are exactly one of the unread indicator colors,
+    # classifying every pixel against the whole palette in a single pass
+    return int(unread_palette.counts(arr).sum())
@@ -1,5 +1,8 @@
+from functools import lru_cache
+
 import numpy as np
-import sounddevice as sd
+
+from audio_mixer import URGENT, get_mixer
 
 def generate_tone(frequency, duration, sample_rate=44100):
     """Generate a sine wave tone."""
@@ -8,21 +11,47 @@ def generate_tone(frequency, duration, sample_rate=44100):
 
 def apply_fade(audio, sample_rate, fade_duration):
     """Apply fade-in and fade-out to the audio."""
-    fade_samples = int(sample_rate * fade_duration)
+    fade_samples = min(int(sample_rate * fade_duration), len(audio) // 2)
+    if fade_samples <= 0:
+        return audio
     fade_in = np.linspace(0, 1, fade_samples)
     fade_out = np.linspace(1, 0, fade_samples)
-    
+
     audio[:fade_samples] *= fade_in  # Fade-in
     audio[-fade_samples:] *= fade_out  # Fade-out
     return audio
 
-def play_chord(chord_frequencies, duration=2, sample_rate=44100, fade_duration=0.5):
-    """Play a chord with fade-in and fade-out."""
-    chord = sum(generate_tone(freq, duration, sample_rate) for freq in chord_frequencies)
-    chord = chord / len(chord_frequencies)  # Normalize amplitude
-    chord = apply_fade(chord, sample_rate, fade_duration)  # Apply fade effects
-    sd.play(chord, samplerate=sample_rate)
-    sd.wait()
+@lru_cache(maxsize=32)
+def _render_chord(frequencies, duration, sample_rate, fade_duration):
+    t = np.arange(int(sample_rate * duration)) / sample_rate
+    # One broadcasted (notes x samples) sine, summed over the notes
+    freqs = np.asarray(frequencies, dtype=np.float64)[:, np.newaxis]
+    chord = 0.5 * np.sin(2 * np.pi * freqs * t).sum(axis=0)
+    chord /= len(frequencies)  # Normalize amplitude
+    chord = apply_fade(chord, sample_rate, fade_duration).astype(np.float32)
+    chord.setflags(write=False)  # Shared between callers via the cache
+    return chord
+
+def render_chord(chord_frequencies, duration=2, sample_rate=44100, fade_duration=0.5):
+    """
+    Render a chord with fade-in and fade-out to a float32 buffer.
+    Buffers are cached, so repeating the same chord costs nothing to prepare.
+    The returned array is read-only.
+    """
+    return _render_chord(tuple(float(f) for f in chord_frequencies), float(duration),
+                         int(sample_rate), float(fade_duration))
+
+def play_chord(chord_frequencies, duration=2, sample_rate=44100, fade_duration=0.5, blocking=True,
+               volume=1.0, priority=URGENT):
+    """
+    Play a chord with fade-in and fade-out through the shared audio mixer.
+    Returns the mixer Voice at once if blocking is False.
+    """
+    chord = render_chord(chord_frequencies, duration, sample_rate, fade_duration)
+    voice = get_mixer().play(chord, volume=volume, priority=priority, sample_rate=sample_rate)
+    if blocking:
+        voice.wait()
+    return voice
 
 if __name__ == "__main__":
     # Frequencies for Fsus4 chord: F (174.61 Hz), Bb (233.08 Hz), C (261.63 Hz)
@@ -0,0 +1,309 @@
+"""
+Deadline scheduler for daily and day-of-week reminders.
+
+Jobs sit in a min-heap keyed by their next fire time. The scheduler sleeps
+exactly until the earliest deadline (or until a job is added or cancelled),
+pops only the jobs that are due and pushes each one back with its next fire
+time. Nothing wakes up once a second and nothing scans every job, so loading
+thousands of reminders costs O(log n) per fire instead of O(n) per second.
+
+Time comes from a clock object, so the same scheduler can run against the
+wall clock (SystemClock) or a VirtualClock that jumps straight to each
+deadline, replaying days of alerts in milliseconds.
+
+Usage:
+    python deadline_scheduler.py --bench               # compare with schedule.run_pending
+    python deadline_scheduler.py --bench --jobs 10000
+
+Can also be imported:
+    from deadline_scheduler import DeadlineScheduler, VirtualClock, WEEKDAYS
+    scheduler = DeadlineScheduler()             # or DeadlineScheduler(VirtualClock(start))
+    scheduler.every_day_at(time(3, 30), show_alert, "Final pass prompt", days=WEEKDAYS)
+    scheduler.run_forever()
+"""
+
+import argparse
+import heapq
+import itertools
+import threading
+import time as time_module
+from datetime import datetime, time, timedelta
+
+DAY_NAMES = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday']
+
+
+def _day_numbers(days):
+    """Turns day names (or weekday() ints) into a frozenset of ints, or None for every day."""
+    if days is None:
+        return None
+    numbers = frozenset(DAY_NAMES.index(d.lower()) if isinstance(d, str) else int(d) for d in days)
+    return numbers or None
+
+
+class SystemClock:
+    """The wall clock: now() is datetime.now() and wait() really sleeps."""
+
+    def now(self):
+        return datetime.now()
+
+    def wait(self, condition, timeout):
+        """Waits on a held threading.Condition for up to timeout seconds (None = forever)."""
+        condition.wait(timeout)
+
+
+class VirtualClock:
+    """
+    A clock that only moves when waited on, for simulations and tests.
+
+    wait() returns immediately after advancing the time by the timeout, so a
+    scheduler driven by it goes from deadline to deadline without sleeping.
+    """
+
+    def __init__(self, start):
+        self.current = start
+
+    def now(self):
+        return self.current
+
+    def wait(self, condition, timeout):
+        if timeout is None:
+            raise RuntimeError("VirtualClock would wait forever: nothing is scheduled")
+        self.current += timedelta(seconds=max(timeout, 0))
+
+
+class Job:
+    """
+    A reminder that fires every day, or on some days of the week, at one time.
+
+    Attributes:
+        name: Label for logs (defaults to the first argument).
+        at: The datetime.time of day it fires.
+        days: frozenset of weekday() numbers it fires on, or None for every day.
+        next_run: The datetime it fires next.
+    """
+
+    def __init__(self, at, callback, args=(), kwargs=None, days=None, day_offset=0, name=None):
+        self.at = at
+        self.callback = callback
+        self.args = args
+        self.kwargs = kwargs or {}
+        # A job that belongs to day D but fires after midnight fires on D + day_offset
+        numbers = _day_numbers(days)
+        self.days = None if numbers is None else frozenset((d + day_offset) % 7 for d in numbers)
+        self.name = name if name is not None else (args[0] if args else getattr(callback, "__name__", "job"))
+        self.next_run = None
+        self.cancelled = False
+
+    def next_after(self, moment):
+        """The first fire time strictly after moment."""
+        candidate = datetime.combine(moment.date(), self.at)
+        if candidate <= moment:
+            candidate += timedelta(days=1)
+        if self.days is not None:
+            while candidate.weekday() not in self.days:
+                candidate += timedelta(days=1)
+        return candidate
+
+    def run(self):
+        return self.callback(*self.args, **self.kwargs)
+
+    def __repr__(self):
+        at = self.at.strftime("%H:%M:%S" if self.at.second or self.at.microsecond else "%H:%M")
+        return f"Job({self.name!r}, at={at}, next_run={self.next_run})"
+
+
+class DeadlineScheduler:
+    """
+    Min-heap of job deadlines that sleeps until the next one is due.
+
+    add/cancel may be called from any thread; they wake run_forever early so
+    a new, earlier deadline is never missed.
+
+    Args:
+        clock: Where the time comes from; SystemClock() by default, or a
+            VirtualClock to simulate.
+    """
+
+    def __init__(self, clock=None):
+        self.clock = clock or SystemClock()
+        self._heap = []  # (next_run, sequence, job)
+        self._counter = itertools.count()
+        self._wakeup = threading.Condition()
+        self._stopped = False
+
+    def add(self, job, now=None):
+        """Schedules a Job and returns it."""
+        now = now or self.clock.now()
+        with self._wakeup:
+            job.next_run = job.next_after(now)
+            heapq.heappush(self._heap, (job.next_run, next(self._counter), job))
+            self._wakeup.notify()
+        return job
+
+    def every_day_at(self, at, callback, *args, days=None, day_offset=0, name=None, **kwargs):
+        """
+        Schedules callback(*args, **kwargs) at a time of day.
+
+        Args:
+            at: A datetime.time (or datetime, whose time is used).
+            callback: What to call.
+            days: Day names like WEEKDAYS or ['sunday'], or None for every day.
+            day_offset: Fire this many days after each listed day (for times
+                that fall after midnight of the job's day).
+            name: Label for logs.
+        """
+        if isinstance(at, datetime):
+            at = at.time()
+        return self.add(Job(at, callback, args, kwargs, days=days, day_offset=day_offset, name=name))
+
+    def cancel(self, job):
+        """Stops a job from firing again. Its heap entry is dropped lazily."""
+        with self._wakeup:
+            job.cancelled = True
+            self._wakeup.notify()
+
+    @property
+    def jobs(self):
+        """The scheduled (not cancelled) jobs, soonest first."""
+        with self._wakeup:
+            return [job for _, _, job in sorted(self._heap) if not job.cancelled]
+
+    def next_deadline(self):
+        """The earliest pending fire time, or None if nothing is scheduled."""
+        with self._wakeup:
+            self._drop_cancelled()
+            return self._heap[0][0] if self._heap else None
+
+    def _drop_cancelled(self):
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)
+
+    def _pop_due(self, now):
+        """Removes and returns the jobs due at or before now, rescheduling each."""
+        due = []
+        with self._wakeup:
+            while self._heap and self._heap[0][0] <= now:
+                fire_time, _, job = heapq.heappop(self._heap)
+                if job.cancelled:
+                    continue
+                due.append(job)
+                # Reschedule from the later of the deadline and now, so a missed
+                # deadline (e.g. the PC was asleep) fires once, not once per missed day
+                job.next_run = job.next_after(max(fire_time, now))
+                heapq.heappush(self._heap, (job.next_run, next(self._counter), job))
+        return due
+
+    def run_pending(self, now=None):
+        """Runs every job that is due. Returns the number run."""
+        due = self._pop_due(now or self.clock.now())
+        for job in due:
+            job.run()
+        return len(due)
+
+    def run_forever(self):
+        """Sleeps until each deadline and runs the due jobs, until stop() is called."""
+        while True:
+            with self._wakeup:
+                if self._stopped:
+                    return
+                self._drop_cancelled()
+                if self._heap:
+                    timeout = (self._heap[0][0] - self.clock.now()).total_seconds()
+                else:
+                    timeout = None
+                if timeout is None or timeout > 0:
+                    # Wakes at the deadline, or early when a job is added or cancelled.
+                    # Capped so a changed wall clock (DST, resume) is noticed within a minute.
+                    self.clock.wait(self._wakeup, 60 if timeout is None else min(timeout, 60))
+                    continue
+            self.run_pending()
+
+    def run_until(self, end):
+        """
+        Runs every job due up to and including end, waiting on the clock between
+        deadlines. With a VirtualClock this returns as fast as the jobs run.
+
+        Returns:
+            The number of jobs run.
+        """
+        runs = 0
+        while True:
+            deadline = self.next_deadline()
+            if deadline is None or deadline > end:
+                return runs
+            with self._wakeup:
+                timeout = (deadline - self.clock.now()).total_seconds()
+                if timeout > 0:
+                    self.clock.wait(self._wakeup, timeout)
+            runs += self.run_pending()
+
+    def stop(self):
+        with self._wakeup:
+            self._stopped = True
+            self._wakeup.notify()
+
+
+def benchmark(job_count):
+    """Compares a simulated day of firing against schedule.run_pending's per-second scan."""
+    start_of_day = datetime(2024, 1, 1)
+    fired = []
+
+    def record(name):
+        fired.append(name)
+
+    scheduler = DeadlineScheduler(VirtualClock(start_of_day))
+    start = time_module.perf_counter()
+    for i in range(job_count):
+        at = time((i * 7) // 60 % 24, (i * 7) % 60)
+        scheduler.add(Job(at, record, (f"job {i}",), days=WEEKDAYS if i % 3 == 0 else None))
+    add_seconds = time_module.perf_counter() - start
+
+    # Walk through one day deadline by deadline on the virtual clock
+    start = time_module.perf_counter()
+    wakeups = 0
+    end_of_day = start_of_day + timedelta(days=1)
+    while scheduler.next_deadline() < end_of_day:
+        wakeups += 1
+        scheduler.run_until(scheduler.next_deadline())
+    day_seconds = time_module.perf_counter() - start
+
+    print(f"{job_count} jobs")
+    print(f"  heap: add all {add_seconds * 1000:8.1f} ms, one simulated day {day_seconds * 1000:8.1f} ms "
+          f"({wakeups} wakeups, {len(fired)} alerts fired)")
+
+    try:
+        import schedule
+    except ImportError:
+        print("  schedule not installed; skipping the run_pending comparison")
+        return
+
+    schedule.clear()
+    for i in range(job_count):
+        schedule.every().day.at(f"{(i * 7) // 60 % 24:02d}:{(i * 7) % 60:02d}").do(record, f"job {i}")
+    samples = 200
+    start = time_module.perf_counter()
+    for _ in range(samples):
+        schedule.run_pending()
+    per_tick = (time_module.perf_counter() - start) / samples
+    print(f"  schedule.run_pending: {per_tick * 1e6:8.1f} us per 1-second tick with nothing due, "
+          f"{per_tick * 86400:8.1f} s of scanning per day")
+    schedule.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Heap-based deadline scheduler")
+    parser.add_argument("--bench", action="store_true", help="Benchmark against schedule.run_pending")
+    parser.add_argument("--jobs", type=int, nargs="+", default=[100, 1000, 5000],
+                        help="Job counts to benchmark (default 100 1000 5000)")
+    args = parser.parse_args()
+
+    if args.bench:
+        for job_count in args.jobs:
+            benchmark(job_count)
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
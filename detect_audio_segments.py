@@ -0,0 +1,311 @@
+"""
+Detect segment boundaries in 'strong bad email songs.mp3' from the audio itself
+and write them to scene_timestamps.csv, in the same format as detect_scenes.py.
+
+random_sb_sound.py only plays the MP3, so its segment boundaries can come from
+the MP3 instead of decoding the matching video. The PCM is read in fixed-size
+blocks (--block seconds). From random_sb_sound's clip bank ("<audio>.pcm.npy")
+when it is up to date, each block is read from the memory map; otherwise the
+file is decoded with pygame first. Every block is cut into overlapping frames
+(WINDOW samples, every HOP samples), and the envelopes are computed for all of
+the block's frames in one vectorized pass:
+
+    RMS energy     in dBFS, for silences
+    spectral flux  the summed increase of the log-magnitude spectrum from one
+                   frame to the next, which peaks where a new sound starts
+    band spectrum  the log-magnitude spectrum pooled into BANDS bands
+
+A boundary goes where the sound resumes after at least --min-silence seconds
+below --silence-db. Flux peaks count too, for clips that butt straight into
+each other (--no-onsets turns this off), but only where the band spectrum of the
+ONSET_CONTEXT seconds after the peak differs from the one before it by at
+least --onset-change. Every beat is a flux peak; only a different sound
+changes the spectrum around it. Boundaries closer than --min-clip keep the
+stronger one, and silences always beat onsets; no boundary falls within
+--min-clip of either end of the file. Like detect_scenes.py, the first --skip
+seconds are skipped.
+
+Usage:
+    python detect_audio_segments.py
+    python detect_audio_segments.py --silence-db -50 --min-silence 0.4
+    python detect_audio_segments.py --onset-change 1.0          # fewer cuts inside songs
+    python detect_audio_segments.py --no-onsets                 # silences only
+    python detect_audio_segments.py --audio "other_file.mp3" --output other.csv
+
+Can also be imported:
+    from detect_audio_segments import detect_audio_segments
+    timestamps = detect_audio_segments("strong bad email songs.mp3")
+
+Outputs: scene_timestamps.csv
+"""
+
+import argparse
+import bisect
+import csv
+import json
+import os
+import time
+
+import numpy as np
+
+AUDIO_FILE = "strong bad email songs.mp3"
+CSV_FILE = "scene_timestamps.csv"
+
+WINDOW = 1024  # samples per analysis frame (~23 ms at 44.1 kHz)
+HOP = 512  # samples between frame starts
+BANDS = 32  # log-spaced bands the spectrum is pooled into for onsets
+ONSET_CONTEXT = 1.0  # seconds compared before and after an onset
+
+
+def load_pcm(audio_path):
+    """
+    Returns (pcm, sample_rate) for an audio file, pcm being (samples, channels) int16.
+
+    Uses random_sb_sound's clip bank ("<audio>.pcm.npy" and "<audio>.segments.json")
+    memory-mapped if it was built from the current file, so nothing is decoded.
+    Otherwise decodes the file with pygame.
+    """
+    pcm_path, table_path = audio_path + ".pcm.npy", audio_path + ".segments.json"
+    if os.path.exists(pcm_path) and os.path.exists(table_path):
+        with open(table_path, "r") as f:
+            table = json.load(f)
+        if table.get("audio_mtime_ns") == os.stat(audio_path).st_mtime_ns:
+            return np.load(pcm_path, mmap_mode="r"), table["sample_rate"]
+
+    import pygame
+
+    pygame.mixer.init()
+    try:
+        sample_rate, _, _ = pygame.mixer.get_init()
+        sound = pygame.mixer.Sound(audio_path)
+        pcm = pygame.sndarray.array(sound)
+        del sound
+    finally:
+        pygame.mixer.quit()
+    if pcm.ndim == 1:
+        pcm = pcm[:, np.newaxis]
+    return pcm, sample_rate
+
+
+def pcm_blocks(pcm, block_samples):
+    """Yields consecutive blocks of pcm as mono float32 in [-1, 1]."""
+    for start in range(0, pcm.shape[0], block_samples):
+        block = np.asarray(pcm[start:start + block_samples], dtype=np.float32)
+        yield block.mean(axis=1) * (1 / 32768)
+
+
+def _band_edges():
+    """Upper FFT bin of each of the BANDS log-spaced bands."""
+    bins = WINDOW // 2 + 1
+    return np.unique(np.geomspace(1, bins, BANDS + 1).astype(int)[1:])
+
+
+def envelopes(blocks):
+    """
+    RMS (dBFS), spectral-flux and band-spectrum envelopes, one value (row) per HOP samples.
+
+    Frame i covers samples i * HOP to i * HOP + WINDOW. Blocks are joined
+    seamlessly: the samples a block's last frames still need, and the previous
+    spectrum for the flux, are carried over to the next block.
+
+    Args:
+        blocks: Iterable of mono float32 sample blocks.
+
+    Returns:
+        (rms_db, flux, bands) float32 arrays; bands is (frames, bands).
+    """
+    window = np.hanning(WINDOW).astype(np.float32)
+    edges = _band_edges()
+    band_starts = np.concatenate([[0], edges[:-1]])
+    band_widths = np.diff(np.concatenate([[0], edges])).astype(np.float32)
+    tail = np.zeros(0, dtype=np.float32)
+    previous = None  # log spectrum of the last frame so far
+    rms_parts, flux_parts, band_parts = [], [], []
+
+    def analyze(samples):
+        nonlocal previous
+        frame_count = (len(samples) - WINDOW) // HOP + 1
+        frames = np.lib.stride_tricks.sliding_window_view(samples, WINDOW)[::HOP][:frame_count]
+        rms = np.sqrt(np.mean(np.square(frames), axis=1))
+        rms_parts.append((20 * np.log10(rms + 1e-10)).astype(np.float32))
+
+        spectrum = np.log1p(100 * np.abs(np.fft.rfft(frames * window, axis=1))).astype(np.float32)
+        if previous is None:
+            previous = spectrum[:1]
+        steps = np.diff(np.concatenate([previous, spectrum]), axis=0)
+        flux_parts.append(np.maximum(steps, 0).sum(axis=1))
+        band_parts.append(np.add.reduceat(spectrum[:, :edges[-1]], band_starts, axis=1) / band_widths)
+        previous = spectrum[-1:]
+        return frame_count
+
+    for block in blocks:
+        samples = np.concatenate([tail, block])
+        if len(samples) < WINDOW:
+            tail = samples
+            continue
+        frame_count = analyze(samples)
+        tail = samples[frame_count * HOP:]
+
+    # Pad the end with silence so the last samples get a frame too
+    if len(tail) > WINDOW - HOP:
+        analyze(np.concatenate([tail, np.zeros(WINDOW - len(tail), dtype=np.float32)]))
+
+    if not rms_parts:
+        empty = np.zeros(0, dtype=np.float32)
+        return empty, empty, np.zeros((0, len(edges)), dtype=np.float32)
+    return np.concatenate(rms_parts), np.concatenate(flux_parts), np.concatenate(band_parts)
+
+
+def silence_ends(rms_db, silence_db, min_frames):
+    """Frame numbers where sound resumes after at least min_frames quiet frames."""
+    quiet = np.concatenate([[0], (rms_db < silence_db).astype(np.int8), [0]])
+    edges = np.diff(quiet)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    # A silence that runs to the end of the file isn't followed by anything
+    keep = (ends - starts >= min_frames) & (ends < len(rms_db))
+    return ends[keep]
+
+
+def onset_peaks(flux, bands, rms_db, silence_db, min_change, context_frames):
+    """
+    Flux peaks where a different sound starts: the mean band spectrum of the
+    context_frames after the peak differs from that of the context_frames
+    before it by at least min_change (mean absolute difference per band).
+    Peaks without the full context on both sides (near either end of the
+    file) are left out, since a mean over a few frames isn't comparable.
+
+    Returns:
+        (frames, change) arrays.
+    """
+    if len(flux) < 3:
+        return np.zeros(0, dtype=int), np.zeros(0)
+    # Local maximum over +-2 frames, so one hit isn't reported on consecutive frames
+    padded = np.pad(flux, 2, constant_values=-np.inf)
+    neighbourhood = np.lib.stride_tricks.sliding_window_view(padded, 5).max(axis=1)
+    peaks = np.flatnonzero((flux == neighbourhood) & (flux > 0) & (rms_db >= silence_db))
+    peaks = peaks[(peaks >= context_frames) & (peaks + context_frames <= len(flux))]
+
+    # Mean spectra before and after every peak at once, from running sums
+    cumulative = np.concatenate([np.zeros((1, bands.shape[1])), np.cumsum(bands, axis=0, dtype=np.float64)])
+    before = (cumulative[peaks] - cumulative[peaks - context_frames]) / context_frames
+    after = (cumulative[peaks + context_frames] - cumulative[peaks]) / context_frames
+    change = np.abs(after - before).mean(axis=1)
+    keep = change >= min_change
+    return peaks[keep], change[keep]
+
+
+def pick_boundaries(candidates, min_gap):
+    """
+    Keeps the strongest candidates that are at least min_gap apart.
+
+    Args:
+        candidates: (position, strength) pairs.
+
+    Returns:
+        Sorted positions.
+    """
+    kept = []
+    for position, _ in sorted(candidates, key=lambda c: -c[1]):
+        i = bisect.bisect_left(kept, position)
+        if (i == 0 or position - kept[i - 1] >= min_gap) and (i == len(kept) or kept[i] - position >= min_gap):
+            kept.insert(i, position)
+    return kept
+
+
+def detect_audio_segments(audio_path, skip_seconds=5.0, min_clip_seconds=3.0, silence_db=-45.0,
+                          min_silence_seconds=0.25, onsets=True, onset_change=0.5, block_seconds=30.0):
+    """
+    Finds segment boundaries (seconds) in an audio file.
+
+    Args:
+        audio_path: MP3, WAV or anything else pygame can decode.
+        skip_seconds: No boundaries before this time.
+        min_clip_seconds: Shortest segment; closer boundaries keep the stronger,
+            and none fall within this of either end of the file.
+        silence_db: RMS level (dBFS) below which a frame counts as silent.
+        min_silence_seconds: Shortest silence that separates segments.
+        onsets: Also cut at flux peaks where the sound changes.
+        onset_change: How much the band spectrum (log magnitude) must change
+            across an onset for it to start a segment.
+        block_seconds: Size of the PCM blocks read and analyzed at a time.
+
+    Returns:
+        Sorted list of boundary timestamps, rounded to milliseconds.
+    """
+    started = time.perf_counter()
+    pcm, sample_rate = load_pcm(audio_path)
+    loaded = time.perf_counter()
+    total_seconds = pcm.shape[0] / sample_rate
+
+    block_samples = max(1, int(block_seconds * sample_rate) // HOP) * HOP
+    rms_db, flux, bands = envelopes(pcm_blocks(pcm, block_samples))
+    frame_seconds = HOP / sample_rate
+
+    candidates = [(int(f), np.inf) for f in silence_ends(rms_db, silence_db,
+                                                          max(1, round(min_silence_seconds / frame_seconds)))]
+    if onsets:
+        context = max(1, round(ONSET_CONTEXT / frame_seconds))
+        peaks, change = onset_peaks(flux, bands, rms_db, silence_db, onset_change, context)
+        candidates += zip(peaks.tolist(), change.tolist())
+    # Nothing in the skipped intro, and no segment shorter than min_clip at either end of the file
+    min_clip_frames = min_clip_seconds / frame_seconds
+    first_frame = max(skip_seconds / frame_seconds, min_clip_frames)
+    last_frame = total_seconds / frame_seconds - min_clip_frames
+    candidates = [c for c in candidates if first_frame <= c[0] <= last_frame]
+    boundaries = pick_boundaries(candidates, min_clip_frames)
+    analyzed = time.perf_counter()
+
+    print(f"Loaded {total_seconds:.1f}s of audio ({sample_rate} Hz) in {loaded - started:.2f}s, "
+          f"analyzed {len(rms_db)} frames in {analyzed - loaded:.2f}s "
+          f"({total_seconds / max(analyzed - started, 1e-9):.0f}x real time)")
+    if len(rms_db):
+        print(f"Loudness {rms_db.min():.1f} to {rms_db.max():.1f} dBFS, silence below {silence_db} dBFS")
+    return [round(frame * frame_seconds, 3) for frame in boundaries]
+
+
+def write_csv(timestamps, output_path):
+    with open(output_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["timestamp_seconds"])
+        for ts in timestamps:
+            writer.writerow([ts])
+    print(f"Wrote {len(timestamps)} timestamps to {output_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detect segment boundaries in an audio file and output CSV timestamps")
+    parser.add_argument("--audio", default=AUDIO_FILE, help="Audio file (MP3 or WAV)")
+    parser.add_argument("--output", default=CSV_FILE, help="Output CSV file path")
+    parser.add_argument("--skip", type=float, default=5.0, help="Skip first N seconds (default 5)")
+    parser.add_argument("--min-clip", type=float, default=3.0,
+                        help="Minimum segment length in seconds (default 3)")
+    parser.add_argument("--silence-db", type=float, default=-45.0,
+                        help="RMS level in dBFS below which audio counts as silence (default -45)")
+    parser.add_argument("--min-silence", type=float, default=0.25,
+                        help="Shortest silence in seconds that separates two segments (default 0.25)")
+    parser.add_argument("--no-onsets", dest="onsets", action="store_false",
+                        help="Only cut at silences, not at onsets where the sound changes")
+    parser.add_argument("--onset-change", type=float, default=0.5,
+                        help="How much the band spectrum must change across a flux peak for it "
+                             "to start a segment; beats within one sound stay well under 0.1 (default 0.5)")
+    parser.add_argument("--block", type=float, default=30.0,
+                        help="Seconds of PCM read and analyzed per block (default 30)")
+    args = parser.parse_args()
+
+    print(f"Detecting segments in: {args.audio}")
+    timestamps = detect_audio_segments(args.audio, skip_seconds=args.skip, min_clip_seconds=args.min_clip,
+                                       silence_db=args.silence_db, min_silence_seconds=args.min_silence,
+                                       onsets=args.onsets, onset_change=args.onset_change,
+                                       block_seconds=args.block)
+
+    print(f"\nFound {len(timestamps)} segment boundaries after {args.skip}s:")
+    for ts in timestamps:
+        mins, secs = divmod(ts, 60)
+        print(f"  {int(mins)}:{secs:06.3f}")
+
+    write_csv(timestamps, args.output)
+
+
+if __name__ == "__main__":
+    main()
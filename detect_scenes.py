@@ -4,55 +4,322 @@ Skips the first 5 seconds. Uses a jump-and-bisect strategy: since each clip is a
 least 3 seconds, we jump ahead ~2 seconds at a time comparing against a reference
 frame. When a change is detected, binary search narrows down the exact frame.
 
+Frames are compared with CuPy on the GPU when CUDA is available and with NumPy
+otherwise (--backend picks one). By default each frame is shrunk 4x with area
+averaging before comparing; the colour channels are kept, so a cut between
+two shots of the same brightness is still seen. With --batch K, the scan reads
+K jumps ahead and compares the K samples against the reference in one vectorized
+operation.
+
+The video is decoded forward (see FrameSource) instead of seeking for every
+sample. When the frames fit in CACHE_BYTES (always, when downscaled) every
+decoded frame is kept in a small cache, so each bisection is answered from
+memory and the file is decoded once, start to end.
+
+--workers N splits the video into overlapping chunks scanned by a process pool,
+each with its own VideoCapture. Chunk results are joined at the first change both
+neighbours report, so the CSV is identical to the serial scan's.
+
+--gallop lets the jump grow while the picture keeps matching the reference:
+it doubles after every unchanged step, up to the given number of seconds,
+and falls back to the ~2 second jump after each change. Long steps are also
+checked at their mid-point, and frames more than one jump ahead are reached by
+seeking, so the frames a long step passes over are never decoded. Any lasting
+change is still found on the same frame; only a change-and-return (a cut away
+and back to the same picture) shorter than about half the current step can be
+skipped. It pays off when most clips are much longer than --min-clip; with
+short clips the extra seeks make it slower. The summary line reports how many
+frames were decoded, to compare runs.
+
+--fingerprints caches histograms of each frame's difference from the previous
+one, per colour channel and for the max-channel difference the scan compares,
+in "<video>.fingerprints.npz" (keyed by the file's size, mtime and a hash,
+plus --downscale). Any --threshold and --noise-floor can then be evaluated from
+the cache in well under a second; see detect_from_fingerprints for how this
+differs from the scan on gradual transitions.
+
+Tolerance: with --downscale 1 the comparison is the original full-resolution
+max-channel difference, so the CSV is identical on either backend. The default
+downscaled comparison is the same max-channel difference on the shrunk BGR
+frames. It puts hard cuts on the same frame, including colour-only cuts (e.g.
+pure red to a gray of the same luma, which a luma comparison would miss). On
+fades and dissolves a change can land up to 2 frames (~0.07 s at 30 fps) from
+the full-resolution result, since the averaging smooths out compression noise
+and the percentage of changed pixels crosses --threshold a little earlier or
+later.
+
 Usage:
     python detect_scenes.py
     python detect_scenes.py --threshold 0.5
     python detect_scenes.py --debug
     python detect_scenes.py --video "other_file.mov"
-
-Outputs: scene_timestamps.csv
+    python detect_scenes.py --backend numpy --downscale 1      # original full-res comparison on CPU
+    python detect_scenes.py --compare-backends                 # time each backend/comparison mode
+    python detect_scenes.py --workers 8                        # scan chunks on 8 cores
+    python detect_scenes.py --fingerprints --threshold 0.8     # re-tune from the cache, no decoding
+    python detect_scenes.py --resume                           # continue an interrupted scan
+    python detect_scenes.py --gallop 30                        # longer jumps through long clips
+
+Outputs: scene_timestamps.csv, written as changes are found. While scanning,
+scene_timestamps.csv.checkpoint.json records how far the scan got, so --resume
+continues an interrupted run instead of starting over.
 """
 
 import argparse
 import csv
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 import cv2
-import cupy as cp
+import numpy as np
 from tqdm import tqdm
 
-
-def read_frame(cap, frame_num):
-    """Seek to a frame number and read it. Returns the frame or None."""
-    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
-    ret, frame = cap.read()
-    return frame if ret else None
+# Array module used for comparisons: numpy, or cupy when a CUDA device is present
+xp = np
+
+
+def get_backend(name="auto"):
+    """
+    Returns the array module for a backend name.
+
+    Args:
+        name: "cupy", "numpy", or "auto" (CuPy if it imports and sees a CUDA device).
+    """
+    if name == "numpy":
+        return np
+    try:
+        import cupy
+        if cupy.cuda.runtime.getDeviceCount() > 0:
+            return cupy
+        reason = "no CUDA device"
+    except Exception as e:  # ImportError, or a CUDA runtime error without a driver
+        reason = str(e)
+    if name == "cupy":
+        raise RuntimeError(f"CuPy backend unavailable: {reason}")
+    return np
+
+
+def set_backend(name="auto"):
+    """Selects the array module used by frames_differ and frames_differ_batch."""
+    global xp
+    xp = get_backend(name)
+    return xp
+
+
+def prepare_frame(frame, downscale=4):
+    """
+    Shrinks a BGR frame by downscale (area averaging), keeping all three
+    channels so colour-only changes still count. downscale 1 leaves the
+    full-resolution frame untouched.
+    """
+    if frame is None or downscale <= 1:
+        return frame
+    h, w = frame.shape[:2]
+    return cv2.resize(frame, (max(1, w // downscale), max(1, h // downscale)), interpolation=cv2.INTER_AREA)
+
+
+# Frames per vectorized comparison when checking a bisection window
+WINDOW_BATCH = 8
+# Memory the frame cache may use to keep every decoded frame
+CACHE_BYTES = 256 * 1024 * 1024
+# Per-frame difference histograms are cached next to the video under this suffix
+FINGERPRINT_SUFFIX = ".fingerprints.npz"
+FINGERPRINT_VERSION = 2  # 2: per-channel BGR and max-channel histograms (1 was luma only)
+
+
+class FrameSource:
+    """
+    Prepared frames from a video, decoded forward wherever possible.
+
+    Seeking (CAP_PROP_POS_FRAMES) makes the decoder start again from the
+    previous keyframe, which is slow on H.264/ProRes .mov files. get() moves
+    forward with grab(), which skips frames without converting them, and only
+    seeks when asked for a frame behind the decoder or far ahead of it.
+    Recently prepared frames are kept in an LRU, so the bisection after a
+    change is served from the cache, or from one short forward decode of the
+    window.
+
+    With keep_skipped, frames passed over on the way to the requested one are
+    prepared and cached too. That costs a retrieve and a resize per frame but
+    means a bisection never has to go back, so the whole video is decoded in
+    exactly one forward pass. It pays off whenever prepared frames are small
+    (downscaled) and seeks are expensive (long-GOP H.264).
+
+    Args:
+        video_path: The video file.
+        downscale: Passed to prepare_frame.
+        cache_frames: Most prepared frames kept.
+        max_skip: Frames ahead of the decoder still reached with grab()
+            rather than a seek.
+        keep_skipped: Prepare and cache every decoded frame, not just the
+            requested ones.
+    """
+
+    def __init__(self, video_path, downscale=4, cache_frames=64, max_skip=600, keep_skipped=False):
+        self.cap = cv2.VideoCapture(video_path)
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS)
+        self.total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        # Size of one prepared (BGR) frame
+        if downscale > 1:
+            self.frame_bytes = max(1, width // downscale) * max(1, height // downscale) * 3
+        else:
+            self.frame_bytes = width * height * 3
+        self.downscale = downscale
+        self.cache_frames = cache_frames
+        self.max_skip = max_skip
+        self.keep_skipped = keep_skipped
+        self._cache = OrderedDict()  # frame number -> prepared frame
+        self._next = 0  # frame number the decoder produces next
+        self.decoded = 0  # frames decoded (grabbed), for reporting
+        self.prepared = 0  # frames retrieved, converted and shrunk
+        self.seeks = 0
+
+    def _seek(self, frame_num):
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
+        self._next = frame_num
+        self.seeks += 1
+
+    def _remember(self, frame_num, frame):
+        self._cache[frame_num] = frame
+        self._cache.move_to_end(frame_num)
+        while len(self._cache) > self.cache_frames:
+            self._cache.popitem(last=False)
+
+    def _decode_next(self, keep=True):
+        """Decodes the frame at the decoder position. Returns it prepared, or None."""
+        if not self.cap.grab():
+            return None
+        frame_num = self._next
+        self._next += 1
+        self.decoded += 1
+        if not keep:
+            return None
+        ret, frame = self.cap.retrieve()
+        if not ret:
+            return None
+        frame = prepare_frame(frame, self.downscale)
+        self.prepared += 1
+        self._remember(frame_num, frame)
+        return frame
+
+    def get(self, frame_num):
+        """Returns the prepared frame, or None past the end of the video."""
+        frame = self._cache.get(frame_num)
+        if frame is not None:
+            self._cache.move_to_end(frame_num)
+            return frame
+        if frame_num < self._next or frame_num - self._next > self.max_skip:
+            self._seek(frame_num)
+        while self._next < frame_num:
+            if self.keep_skipped:
+                if self._decode_next() is None:
+                    return None
+                continue
+            if not self.cap.grab():
+                return None
+            self._next += 1
+            self.decoded += 1
+        return self._decode_next()
+
+    def has_range(self, first, last):
+        """True if frames first..last are all cached."""
+        return all(n in self._cache for n in range(first, last + 1))
+
+    def release(self):
+        self.cap.release()
 
 
 def frames_differ(frame_a, frame_b, noise_floor, threshold):
-    """Compare two frames on GPU. Returns (changed: bool, pct: float)."""
-    gpu_a = cp.asarray(frame_a)
-    gpu_b = cp.asarray(frame_b)
-    diff = cp.abs(gpu_a.astype(cp.int16) - gpu_b.astype(cp.int16))
-    max_channel_diff = cp.max(diff, axis=2)
-    pct = float((max_channel_diff > noise_floor).sum() / max_channel_diff.size * 100)
+    """Compare two frames. Returns (changed: bool, pct: float)."""
+    changed, pct = frames_differ_batch(frame_a, frame_b[np.newaxis], noise_floor, threshold)
+    return bool(changed[0]), float(pct[0])
+
+
+def _pixel_diff(ref_frame, frames):
+    """Per-pixel difference (max over channels for BGR) of a (K, ...) stack against ref_frame, as uint8 on xp."""
+    ref = xp.asarray(ref_frame)
+    batch = xp.asarray(frames)
+    # |a - b| without widening uint8 to int16: half the memory traffic
+    diff = xp.maximum(batch, ref) - xp.minimum(batch, ref)
+    if diff.ndim == 4:
+        # Max channel difference; elementwise over the three planes is much faster than max(axis=3)
+        diff = xp.maximum(xp.maximum(diff[..., 0], diff[..., 1]), diff[..., 2])
+    return diff
+
+
+def frames_differ_batch(ref_frame, frames, noise_floor, threshold):
+    """
+    Compare K frames against one reference in a single vectorized operation.
+
+    Args:
+        ref_frame: (H, W, 3) BGR frame (or (H, W) single-channel).
+        frames: (K, H, W) or (K, H, W, 3) stack of frames shaped like ref_frame.
+
+    Returns:
+        (changed, pct): NumPy arrays of K bools and K percentages.
+    """
+    diff = _pixel_diff(ref_frame, frames)
+    over = (diff > noise_floor).reshape(len(diff), -1)
+    pct = xp.count_nonzero(over, axis=1) * (100 / over.shape[1])
+    if xp is not np:
+        pct = pct.get()
+    pct = np.asarray(pct, dtype=np.float64)
     return pct > threshold, pct
 
 
-def bisect_change(cap, left, right, noise_floor, threshold):
-    """Binary search for the exact frame where the change happens between left and right."""
-    ref_frame = read_frame(cap, left)
+def _window_changes(source, ref_frame, first, last, noise_floor, threshold, batch):
+    """Reads frames first..last in order and compares them to ref_frame in batches. Returns {frame: changed}."""
+    changed = {}
+    numbers, frames = [], []
+    for n in range(first, last + 1):
+        frame = source.get(n)
+        if frame is not None:
+            numbers.append(n)
+            frames.append(frame)
+        if frames and (frame is None or len(frames) == batch or n == last):
+            flags, _ = frames_differ_batch(ref_frame, np.stack(frames), noise_floor, threshold)
+            changed.update(zip(numbers, flags))
+            numbers, frames = [], []
+        if frame is None:
+            break
+    return changed
+
+
+def bisect_change(source, left, right, noise_floor, threshold, batch=WINDOW_BATCH, ref_frame=None):
+    """
+    Binary search for the exact frame where the change happens between left and right.
+
+    If the window is in the source's cache the search probes it directly.
+    Otherwise every frame in the window is read once, by one forward decode
+    from left, and compared against the frame at left in batches of `batch`;
+    the search then runs over those results. Either way it picks the same
+    frame as seeking to each midpoint would. Pass ref_frame if the frame at
+    left is already at hand.
+    """
+    if ref_frame is None:
+        ref_frame = source.get(left)
     if ref_frame is None:
         return right
 
+    if source.has_range(left + 1, right - 1):
+        def is_changed(n):
+            return frames_differ(ref_frame, source.get(n), noise_floor, threshold)[0]
+    else:
+        changed = _window_changes(source, ref_frame, left + 1, right - 1, noise_floor, threshold, batch)
+
+        def is_changed(n):
+            # An unreadable frame counts as changed, like the seeking search did
+            return changed.get(n, True)
+
     while right - left > 1:
         mid = (left + right) // 2
-        mid_frame = read_frame(cap, mid)
-        if mid_frame is None:
-            right = mid
-            continue
-
-        changed, _ = frames_differ(ref_frame, mid_frame, noise_floor, threshold)
-        if changed:
+        if is_changed(mid):
             right = mid
         else:
             left = mid
@@ -60,74 +327,549 @@ def bisect_change(cap, left, right, noise_floor, threshold):
     return right
 
 
-def detect_scenes(video_path, threshold=0.5, noise_floor=3, skip_seconds=5.0,
-                  min_clip_seconds=3.0, debug=False):
-    cap = cv2.VideoCapture(video_path)
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-
-    # Jump size: ~2 seconds (safely under the 3-second minimum clip length)
-    jump = int(fps * min_clip_seconds * 0.66)
-    if jump < 1:
-        jump = 1
-
-    skip_frame = int(skip_seconds * fps)
-    timestamps = []
+def _configure_cache(source, jump, batch):
+    """
+    Keeps every decoded frame (and never seeks back) if the frames since the last
+    bisection plus the whole next window (up to `batch` jumps wide) fit in
+    CACHE_BYTES; otherwise keeps only the sampled frames, and each bisection
+    window is decoded again.
+    """
+    keep_frames = 2 * jump * batch + batch + 2
+    if source.frame_bytes * keep_frames <= CACHE_BYTES:
+        source.keep_skipped = True
+        source.cache_frames = keep_frames
+    else:
+        source.cache_frames = batch + WINDOW_BATCH + 2
+
+
+def _scan(source, start, stop, jump, noise_floor, threshold, batch, progress=None, debug=False,
+          ref_start=None, step_start=None, max_jump=None, on_change=None, on_step=None):
+    """
+    Jump-and-bisect scan from frame `start` until the scan position reaches `stop`.
+
+    With max_jump (galloping), the step doubles after every step whose samples
+    all match the reference, up to max_jump frames, and drops back to `jump` after
+    a change. A step longer than `jump` is checked at its mid-point as well as its
+    end, so samples are never more than half a step apart. When a long step
+    shows a change, the stretch from its last matching sample is walked again
+    with the normal jump, so every change is bisected in a window no wider than
+    the fixed stride's. Only frames inside normal jumps are decoded; anything
+    more than one jump ahead is reached with a seek (the source's max_skip is
+    lowered to `jump` for the scan), so long steps skip decoding the frames
+    they pass over. A change that lasts to the end of a step is always found
+    (the end sample differs). A change-and-return (a cut away and back to the
+    reference picture) shorter than about half the current step can be
+    skipped; max_jump bounds how long that can be. `batch` is ignored while
+    galloping.
+
+    The whole state of the scan is its position, the frame number of its
+    reference (`ref_start`, default `start`) and the step (`step_start`,
+    default `jump`), so passing checkpointed values continues exactly where an
+    earlier scan stopped. What the scan does after a change depends only on the
+    frame where the change was found, so two scans that report the same change
+    frame agree from there on.
+
+    Args:
+        progress: tqdm bar counting frames scanned past.
+        on_change: Called with each change frame as it is found.
+        on_step: Called with (pos, ref_pos, step, max_pct) after every step.
+
+    Returns:
+        (change_frames, max_pct)
+    """
+    total_frames = source.total_frames
+    changes = []
     max_pct = 0.0
 
-    # Estimate how many jumps we'll do for the progress bar
-    estimated_jumps = (total_frames - skip_frame) // jump
-    progress = tqdm(total=estimated_jumps, unit="jumps", desc="Scanning")
-    progress.set_postfix(found=0)
-
-    pos = skip_frame
-    ref_frame = read_frame(cap, pos)
-    if ref_frame is None:
-        cap.release()
-        return timestamps
-
-    while pos < total_frames:
-        next_pos = pos + jump
-        if next_pos >= total_frames:
-            next_pos = total_frames - 1
-        if next_pos <= pos:
+    pos = start
+    ref_pos = start if ref_start is None else ref_start
+    galloping = max_jump is not None and max_jump > jump
+    step = jump if step_start is None or not galloping else step_start
+    keep_skipped = source.keep_skipped
+    if galloping:
+        source.max_skip = min(source.max_skip, jump)
+    ref_frame = source.get(ref_pos)
+    pos_frame = source.get(pos)  # differs from the reference once pos moves on
+    if ref_frame is None or pos_frame is None:
+        return changes, max_pct
+
+    while pos < stop:
+        if galloping:
+            # Long steps are verified at their mid-point too. Frames stepped over are
+            # only kept for normal jumps, which is where bisections happen.
+            offsets = [step // 2, step] if step > jump else [step]
+            source.keep_skipped = keep_skipped and step <= jump
+        else:
+            # The next `batch` jump positions, all compared against the reference at once
+            offsets = [jump * i for i in range(1, batch + 1)]
+        positions = []
+        for offset in offsets:
+            next_pos = min(pos + offset, total_frames - 1)
+            if next_pos <= (positions[-1] if positions else pos):
+                continue
+            positions.append(next_pos)
+        if not positions:
             break
+        last_pos = pos
 
-        sample_frame = read_frame(cap, next_pos)
-        if sample_frame is None:
+        samples = []
+        for next_pos in positions:
+            sample_frame = source.get(next_pos)
+            if sample_frame is None:
+                break
+            samples.append(sample_frame)
+        if not samples:
             break
+        end_of_video = len(samples) < len(positions)
+        positions = positions[:len(samples)]
 
-        changed, pct = frames_differ(ref_frame, sample_frame, noise_floor, threshold)
-        if pct > max_pct:
-            max_pct = pct
-
-        if changed:
-            # Binary search for exact change frame between pos and next_pos
-            change_frame = bisect_change(cap, pos, next_pos, noise_floor, threshold)
-            timestamp = round(change_frame / fps, 3)
-            timestamps.append(timestamp)
-            mins, secs = divmod(timestamp, 60)
-            progress.set_postfix(found=len(timestamps), latest=f"{int(mins)}:{secs:06.3f}")
+        changed, pct = frames_differ_batch(ref_frame, np.stack(samples), noise_floor, threshold)
+        # Samples past the first change were compared against a stale reference; ignore them
+        used = int(np.argmax(changed)) + 1 if changed.any() else len(samples)
+        max_pct = max(max_pct, float(pct[:used].max()))
 
+        first = used - 1
+        if changed.any() and first:
+            left, left_frame = positions[first - 1], samples[first - 1]
+        else:
+            left, left_frame = pos, pos_frame
+
+        if changed.any() and galloping and step > jump:
+            # Walk the changed stretch again with the normal jump from its last matching sample,
+            # rather than decoding up to half a long step to bisect it
+            pos, pos_frame = left, left_frame
+            step = jump
+        elif changed.any():
+            # Search for the exact change frame between the last unchanged sample and the first changed one
+            change_frame = bisect_change(source, left, positions[first], noise_floor, threshold,
+                                         ref_frame=left_frame)
+            changes.append(change_frame)
+            if on_change is not None:
+                on_change(change_frame)
+            if progress is not None or debug:
+                mins, secs = divmod(round(change_frame / source.fps, 3), 60)
+            if progress is not None:
+                progress.set_postfix(found=len(changes), latest=f"{int(mins)}:{secs:06.3f}")
             if debug:
-                tqdm.write(f"  {pct:6.2f}% changed — bisected to frame {change_frame} ({int(mins)}:{secs:06.3f})")
+                tqdm.write(f"  {pct[first]:6.2f}% changed — bisected to frame {change_frame} ({int(mins)}:{secs:06.3f})")
 
             # Move past this change and grab a new reference frame
-            ref_frame = read_frame(cap, change_frame)
+            ref_frame = source.get(change_frame)
             if ref_frame is None:
                 break
-            pos = change_frame
+            pos = ref_pos = change_frame
+            pos_frame = ref_frame
+            step = jump
         else:
-            pos = next_pos
+            pos = positions[-1]
+            pos_frame = samples[-1]
+            if end_of_video:
+                break
+            if galloping:
+                step = min(step * 2, max_jump)
+
+        if progress is not None:
+            progress.update(pos - last_pos)
+        if on_step is not None:
+            on_step(pos, ref_pos, step, max_pct)
+
+    return changes, max_pct
+
+
+def _scan_chunk(video_path, backend, start, stop, jump, noise_floor, threshold, downscale, batch, max_jump):
+    """Runs _scan in a worker process with its own VideoCapture. Returns (changes, max_pct, decoded, prepared, seeks)."""
+    set_backend(backend)
+    source = FrameSource(video_path, downscale)
+    _configure_cache(source, jump, batch)
+    try:
+        changes, max_pct = _scan(source, start, stop, jump, noise_floor, threshold, batch, max_jump=max_jump)
+    finally:
+        source.release()
+    return changes, max_pct, source.decoded, source.prepared, source.seeks
+
+
+def _merge_chunks(chunk_changes, bounds, rescan):
+    """
+    Joins per-chunk change lists into the list a serial scan would produce.
+
+    Chunk k was scanned from bounds[k] (with a fresh reference there) into the
+    next chunk's overlap. The list so far is exact; chunk k's list joins it at the
+    first change frame both report, since from a shared change on both scans are
+    identical, so a cut found on either side of a chunk edge is kept exactly once.
+    If the overlap holds no shared change, rescan(start, k) re-runs chunk k
+    serially from the last exact change.
+    """
+    merged = list(chunk_changes[0])
+    for k in range(1, len(chunk_changes)):
+        known = set(merged)
+        common = next((c for c in chunk_changes[k] if c in known), None)
+        if common is not None:
+            merged = [c for c in merged if c < common] + [c for c in chunk_changes[k] if c >= common]
+        else:
+            start = merged[-1] if merged else bounds[0]
+            merged = merged + [c for c in rescan(start, k) if c > start]
+    return merged
+
+
+def _parallel_scan(video_path, source, skip_frame, jump, noise_floor, threshold, downscale, batch,
+                   workers, overlap, max_jump=None):
+    """Scans chunks of the video in a process pool and merges them. Returns (changes, max_pct)."""
+    total_frames = source.total_frames
+    chunks = max(1, min(workers * 2, (total_frames - skip_frame) // max(1, overlap)))
+    bounds = [skip_frame + (total_frames - skip_frame) * k // chunks for k in range(chunks)] + [total_frames]
+    stops = [min(bounds[k + 1] + overlap, total_frames) for k in range(chunks)]
+    backend = "cupy" if xp is not np else "numpy"
+    settings = (jump, noise_floor, threshold, downscale, batch, max_jump)
+
+    results = [None] * chunks
+    progress = tqdm(total=total_frames - skip_frame, unit="frames", desc=f"Scanning ({workers} workers)")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_scan_chunk, video_path, backend, bounds[k], stops[k], *settings): k
+                   for k in range(chunks)}
+        for future in as_completed(futures):
+            k = futures[future]
+            results[k] = future.result()
+            progress.update(bounds[k + 1] - bounds[k])
+    progress.close()
 
-        progress.update(1)
+    rescans = 0
+
+    def rescan(start, k):
+        nonlocal rescans
+        rescans += 1
+        changes, _ = _scan(source, start, stops[k], jump, noise_floor, threshold, batch, max_jump=max_jump)
+        return changes
+
+    changes = _merge_chunks([r[0] for r in results], bounds, rescan)
+    source.decoded += sum(r[2] for r in results)
+    source.prepared += sum(r[3] for r in results)
+    source.seeks += sum(r[4] for r in results)
+    if rescans:
+        print(f"{rescans} chunk edges had no shared change in the overlap and were rescanned serially")
+    return changes, max(r[1] for r in results)
+
+
+class ScanOutput:
+    """
+    Streams change timestamps to the CSV as they are found, with a checkpoint of
+    the scan position next to it ("<output>.checkpoint.json").
+
+    Rows are flushed as they are written. Every fsync_seconds the CSV is fsynced
+    and the checkpoint (scan position, reference frame, step, rows written so far) is
+    replaced atomically, so after a crash the checkpoint never points past rows
+    that aren't on disk. The checkpoint is deleted once the scan finishes.
+
+    Args:
+        output_path: The CSV file.
+        settings: Everything the result depends on (video identity and
+            detection parameters); a checkpoint is only resumed if they match.
+        fsync_seconds: Seconds between fsyncs/checkpoints.
+    """
+
+    def __init__(self, output_path, settings, fsync_seconds=5.0):
+        self.output_path = output_path
+        self.checkpoint_path = output_path + ".checkpoint.json"
+        self.settings = settings
+        self.fsync_seconds = fsync_seconds
+        self.timestamps = []
+        self._file = None
+        self._writer = None
+        self._last_sync = time.monotonic()
+
+    def open(self, resume=False):
+        """
+        Opens the CSV. With resume, returns the checkpointed (pos, ref_pos, step, max_pct)
+        and keeps the rows it covers; otherwise (or if there is no usable
+        checkpoint) starts a new file and returns None.
+        """
+        state = self._read_checkpoint() if resume else None
+        if resume and state is None:
+            print(f"No usable checkpoint in {self.checkpoint_path}; starting from the beginning")
+        if state is not None:
+            with open(self.output_path, "r", newline="") as f:
+                rows = list(csv.reader(f))[1:]
+            # Rows after the checkpoint will be found again
+            self.timestamps = [float(row[0]) for row in rows[:state["rows"]]]
+            self._file = open(self.output_path, "w", newline="")
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(["timestamp_seconds"])
+            self._writer.writerows([ts] for ts in self.timestamps)
+            self._file.flush()
+            print(f"Resuming at frame {state['pos']} with {len(self.timestamps)} timestamps already found")
+            return state["pos"], state["ref_pos"], state["step"], state["max_pct"]
+
+        self._file = open(self.output_path, "w", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(["timestamp_seconds"])
+        self._file.flush()
+        return None
+
+    def _read_checkpoint(self):
+        try:
+            with open(self.checkpoint_path, "r") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get("settings") != self.settings or not os.path.exists(self.output_path):
+            return None
+        return state
+
+    def add(self, timestamp):
+        self.timestamps.append(timestamp)
+        self._writer.writerow([timestamp])
+        self._file.flush()
+
+    def checkpoint(self, pos, ref_pos, step, max_pct, force=False):
+        """Fsyncs the CSV and records the scan position, at most every fsync_seconds unless forced."""
+        now = time.monotonic()
+        if not force and now - self._last_sync < self.fsync_seconds:
+            return
+        self._last_sync = now
+        os.fsync(self._file.fileno())
+        state = {"settings": self.settings, "pos": pos, "ref_pos": ref_pos, "step": step, "max_pct": max_pct,
+                 "rows": len(self.timestamps)}
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def finish(self):
+        """Fsyncs and closes the CSV and removes the checkpoint."""
+        os.fsync(self._file.fileno())
+        self._file.close()
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        print(f"Wrote {len(self.timestamps)} timestamps to {self.output_path}")
 
-    progress.close()
-    cap.release()
+
+def detect_scenes(video_path, threshold=0.5, noise_floor=3, skip_seconds=5.0,
+                  min_clip_seconds=3.0, debug=False, downscale=4, batch=1, workers=1, overlap_seconds=30.0,
+                  output_path=None, resume=False, max_jump_seconds=None):
+    """
+    Finds the timestamps (seconds) of scene changes.
+
+    With output_path, the timestamps are also written to that CSV: streamed as
+    they are found, with a checkpoint that resume=True picks up from (serial scan),
+    or all at once at the end (workers > 1). With max_jump_seconds the scan
+    gallops (see _scan) up to steps of that length.
+    """
+    source = FrameSource(video_path, downscale)
+    fps = source.fps
+    total_frames = source.total_frames
+
+    # Jump size: ~2 seconds (safely under the 3-second minimum clip length)
+    jump = int(fps * min_clip_seconds * 0.66)
+    if jump < 1:
+        jump = 1
+    max_jump = max(jump, int(fps * max_jump_seconds)) if max_jump_seconds else None
+    _configure_cache(source, jump, batch)
+
+    skip_frame = int(skip_seconds * fps)
+
+    if workers > 1:
+        if resume:
+            print("--resume only applies to the serial scan (--workers 1); scanning the whole video")
+        overlap = max(jump * 2, int(overlap_seconds * fps))
+        changes, max_pct = _parallel_scan(video_path, source, skip_frame, jump, noise_floor, threshold,
+                                          downscale, batch, workers, overlap, max_jump)
+        timestamps = [round(change_frame / fps, 3) for change_frame in changes]
+        if output_path is not None:
+            write_csv(timestamps, output_path)
+    else:
+        output = None
+        start, ref_start, step_start, max_pct = skip_frame, None, None, 0.0
+        if output_path is not None:
+            stat = os.stat(video_path)
+            settings = {"video": os.path.abspath(video_path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                        "threshold": threshold, "noise_floor": noise_floor, "skip_frame": skip_frame,
+                        "jump": jump, "max_jump": max_jump, "downscale": downscale, "batch": batch}
+            output = ScanOutput(output_path, settings)
+            state = output.open(resume)
+            if state is not None:
+                start, ref_start, step_start, max_pct = state
+
+        progress = tqdm(total=total_frames - skip_frame, initial=start - skip_frame, unit="frames", desc="Scanning")
+        progress.set_postfix(found=len(output.timestamps) if output else 0)
+        if output is not None:
+            on_change = lambda change_frame: output.add(round(change_frame / fps, 3))
+            on_step = lambda pos, ref_pos, step, pct: output.checkpoint(pos, ref_pos, step, max(max_pct, pct))
+        else:
+            on_change = on_step = None
+        changes, scan_max_pct = _scan(source, start, total_frames, jump, noise_floor, threshold, batch,
+                                      progress=progress, debug=debug, ref_start=ref_start,
+                                      step_start=step_start, max_jump=max_jump,
+                                      on_change=on_change, on_step=on_step)
+        progress.close()
+        max_pct = max(max_pct, scan_max_pct)
+        if output is not None:
+            output.finish()
+            timestamps = output.timestamps
+        else:
+            timestamps = [round(change_frame / fps, 3) for change_frame in changes]
+
+    source.release()
     print(f"Max % pixels changed seen: {max_pct:.2f}%")
+    print(f"Decoded {source.decoded} of {total_frames} frames ({source.prepared} prepared and compared) "
+          f"with {source.seeks} seeks; jump {jump} frames" + (f", galloping up to {max_jump}" if max_jump else ""))
     return timestamps
 
 
+def _video_key(video_path):
+    """Identifies a video by size, mtime and a hash of its first and last MiB (hashing GBs would take as long as decoding)."""
+    stat = os.stat(video_path)
+    digest = hashlib.blake2b(str(stat.st_size).encode(), digest_size=16)
+    with open(video_path, "rb") as f:
+        digest.update(f.read(1 << 20))
+        if stat.st_size > 2 << 20:
+            f.seek(-(1 << 20), os.SEEK_END)
+            digest.update(f.read(1 << 20))
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "digest": digest.hexdigest()}
+
+
+def build_fingerprints(video_path, downscale=4):
+    """
+    Decodes the video once and stores, for every frame, 256-bin histograms of
+    its per-pixel difference from the previous frame: one for each of the B, G
+    and R channels and one for the max-channel difference, which is what the
+    scan thresholds. Writes <video>.fingerprints.npz and returns the loaded
+    fingerprints.
+    """
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    histograms = []
+    pixels = 0
+    prev = None
+    for _ in tqdm(range(total_frames), unit="frames", desc="Fingerprinting"):
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frame = prepare_frame(frame, downscale)
+        if prev is None:
+            pixels = frame.shape[0] * frame.shape[1]
+            histograms.append(np.zeros((4, 256), dtype=np.uint32))
+        else:
+            a, b = xp.asarray(prev), xp.asarray(frame)
+            channels = xp.maximum(a, b) - xp.minimum(a, b)
+            channel_max = xp.maximum(xp.maximum(channels[..., 0], channels[..., 1]), channels[..., 2])
+            # Offset each plane into its own 256 bins so one bincount covers all four
+            planes = xp.stack([channels[..., 0], channels[..., 1], channels[..., 2], channel_max])
+            offsets = (xp.arange(4, dtype=xp.int32) * 256).reshape(4, 1, 1)
+            hist = xp.bincount((planes + offsets).ravel(), minlength=4 * 256).reshape(4, 256)
+            histograms.append(np.asarray(hist.get() if xp is not np else hist, dtype=np.uint32))
+        prev = frame
+    cap.release()
+
+    np.savez_compressed(video_path + FINGERPRINT_SUFFIX, histograms=np.array(histograms, dtype=np.uint32),
+                        fps=fps, pixels=pixels, downscale=downscale, version=FINGERPRINT_VERSION,
+                        **_video_key(video_path))
+    print(f"Wrote fingerprints of {len(histograms)} frames to {video_path + FINGERPRINT_SUFFIX}")
+    return load_fingerprints(video_path, downscale)
+
+
+def load_fingerprints(video_path, downscale=4):
+    """
+    Returns the cached fingerprints for the video, or None if there are none or
+    they belong to another version of the file, another --downscale or an
+    older fingerprint format.
+
+    Returns:
+        dict with "fps", "pixels", "channels": the (frames, 3, 256) B, G, R
+        difference histograms, and "over": (frames, 257) counts of pixels whose
+        max-channel difference from the previous frame is >= each value 0..256.
+    """
+    path = video_path + FINGERPRINT_SUFFIX
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        key = _video_key(video_path)
+        if ("version" not in data or int(data["version"]) != FINGERPRINT_VERSION
+                or int(data["size"]) != key["size"] or int(data["mtime_ns"]) != key["mtime_ns"]
+                or str(data["digest"]) != key["digest"] or int(data["downscale"]) != downscale):
+            return None
+        histograms = data["histograms"].astype(np.int64)
+        fps, pixels = float(data["fps"]), int(data["pixels"])
+    # over[:, v] = pixels with max-channel difference >= v, so "> noise_floor" is over[:, noise_floor + 1]
+    channel_max = histograms[:, 3]
+    over = np.zeros((len(histograms), 257), dtype=np.int64)
+    over[:, :256] = np.cumsum(channel_max[:, ::-1], axis=1)[:, ::-1]
+    return {"fps": fps, "pixels": pixels, "channels": histograms[:, :3], "over": over}
+
+
+def detect_from_fingerprints(fingerprints, threshold=0.5, noise_floor=3, skip_seconds=5.0):
+    """
+    Finds changes from cached fingerprints without decoding anything: a frame is
+    a change when the percent of its pixels differing from the previous frame by
+    more than noise_floor exceeds threshold.
+
+    This compares neighbouring frames rather than a reference frame, so it puts
+    hard cuts on the same frames as the scan, but a transition spread over many
+    frames (slow fades, pans) can be reported on different frames, or missed if
+    no single step crosses the threshold.
+
+    Returns:
+        (timestamps, max_pct)
+    """
+    fps = fingerprints["fps"]
+    column = min(max(int(noise_floor) + 1, 0), 256)
+    pct = fingerprints["over"][:, column] * (100 / fingerprints["pixels"])
+    skip_frame = int(skip_seconds * fps)
+    pct[:skip_frame + 1] = 0
+    change_frames = np.flatnonzero(pct > threshold)
+    return [round(int(n) / fps, 3) for n in change_frames], float(pct.max(initial=0.0))
+
+
+def compare_backends(video_path, samples=64, batch=8, noise_floor=3, threshold=0.5):
+    """Times the comparison step for every available backend and comparison mode."""
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    for _ in range(samples + 1):
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    if len(frames) < 2:
+        print(f"Couldn't read frames from {video_path}")
+        return
+
+    backends = ["numpy"]
+    if get_backend("auto") is not np:
+        backends.append("cupy")
+
+    print(f"Comparing {len(frames) - 1} frames of {frames[0].shape[1]}x{frames[0].shape[0]} against a reference")
+    for backend in backends:
+        set_backend(backend)
+        for downscale in (1, 2, 4):
+            prepared = [prepare_frame(f, downscale) for f in frames]
+            ref, rest = prepared[0], prepared[1:]
+            frames_differ_batch(ref, np.stack(rest[:batch]), noise_floor, threshold)  # warm up
+
+            start = time.perf_counter()
+            single = [frames_differ(ref, f, noise_floor, threshold)[1] for f in rest]
+            single_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            batched = []
+            for i in range(0, len(rest), batch):
+                batched.extend(frames_differ_batch(ref, np.stack(rest[i:i + batch]), noise_floor, threshold)[1])
+            batch_seconds = time.perf_counter() - start
+
+            # Preparing (the resize) happens on the CPU for every backend, so count it
+            start = time.perf_counter()
+            for f in frames:
+                prepare_frame(f, downscale)
+            prepare_seconds = time.perf_counter() - start
+
+            mode = "full-res BGR" if downscale == 1 else f"1/{downscale} BGR"
+            n = len(rest)
+            print(f"  {backend:5s} {mode:12s}: prepare {prepare_seconds / len(frames) * 1000:6.2f} ms/frame, "
+                  f"single {single_seconds / n * 1000:6.2f} ms, batch of {batch} {batch_seconds / n * 1000:6.2f} ms "
+                  f"per comparison (max pct diff single vs batch {np.max(np.abs(np.array(single) - batched)):.1e})")
+
+
 def write_csv(timestamps, output_path="scene_timestamps.csv"):
     with open(output_path, "w", newline="") as f:
         writer = csv.writer(f)
@@ -144,27 +886,75 @@ def main():
                         help="Percent of pixels that must change to count as new scene (default 0.5)")
     parser.add_argument("--noise-floor", type=int, default=3,
                         help="Per-pixel difference below this is ignored as compression noise (default 3)")
-    parser.add_argument("--min-clip", type=float, default=3.0,
+    parser.add_argument("--min-clip", type=float, default=None,
                         help="Minimum clip length in seconds (default 3)")
     parser.add_argument("--debug", action="store_true",
                         help="Print details when changes are found")
     parser.add_argument("--output", default="scene_timestamps.csv", help="Output CSV file path")
     parser.add_argument("--skip", type=float, default=5.0, help="Skip first N seconds (default 5)")
+    parser.add_argument("--backend", choices=["auto", "numpy", "cupy"], default="auto",
+                        help="Array backend for comparisons (default auto: CuPy if CUDA is available)")
+    parser.add_argument("--downscale", type=int, default=4,
+                        help="Compare frames shrunk by this factor (area averaged, colour kept); 1 = full resolution (default 4)")
+    parser.add_argument("--batch", type=int, default=1,
+                        help="Jump samples read ahead and compared against the reference in one vectorized "
+                             "batch; worth raising on the GPU, where each comparison has a fixed cost (default 1)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Scan overlapping chunks in this many processes (default 1)")
+    parser.add_argument("--overlap", type=float, default=30.0,
+                        help="Seconds each chunk scans into the next one, to line up with it (default 30)")
+    parser.add_argument("--fingerprints", action="store_true",
+                        help="Detect from the per-frame fingerprint cache (built by one decode the first time) "
+                             "so re-runs with another --threshold or --noise-floor don't decode the video; "
+                             "not combinable with --min-clip, --gallop, --workers or --resume")
+    parser.add_argument("--gallop", type=float, nargs="?", const=60.0, default=None, metavar="MAX_SECONDS",
+                        help="Double the jump while frames keep matching, up to MAX_SECONDS (default 60), "
+                             "checking long jumps at their mid-point and seeking past the frames they skip; "
+                             "a change-and-return shorter than about half the current jump can be missed")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted scan from its checkpoint (<output>.checkpoint.json)")
+    parser.add_argument("--compare-backends", action="store_true",
+                        help="Time each backend and comparison mode on the video's first frames and exit")
     args = parser.parse_args()
 
+    if args.fingerprints:
+        # These shape the jump-and-bisect scan, which --fingerprints doesn't run
+        ignored = [flag for flag, given in (("--min-clip", args.min_clip is not None), ("--gallop", args.gallop is not None),
+                                            ("--workers", args.workers != 1), ("--resume", args.resume)) if given]
+        if ignored:
+            parser.error(f"{', '.join(ignored)} can't be used with --fingerprints")
+    if args.min_clip is None:
+        args.min_clip = 3.0
+
+    if args.compare_backends:
+        compare_backends(args.video, batch=max(2, args.batch), noise_floor=args.noise_floor, threshold=args.threshold)
+        return
+
+    backend = set_backend(args.backend)
     print(f"Detecting frame changes in: {args.video}")
     print(f"Threshold: {args.threshold}%, noise floor: {args.noise_floor}, min clip: {args.min_clip}s, skipping first {args.skip}s")
-
-    timestamps = detect_scenes(args.video, threshold=args.threshold, noise_floor=args.noise_floor,
-                               skip_seconds=args.skip, min_clip_seconds=args.min_clip, debug=args.debug)
+    print(f"Backend: {backend.__name__}, downscale: {args.downscale}, batch: {args.batch}")
+
+    if args.fingerprints:
+        fingerprints = load_fingerprints(args.video, args.downscale)
+        if fingerprints is None:
+            fingerprints = build_fingerprints(args.video, args.downscale)
+        timestamps, max_pct = detect_from_fingerprints(fingerprints, threshold=args.threshold,
+                                                       noise_floor=args.noise_floor, skip_seconds=args.skip)
+        print(f"Max % pixels changed seen: {max_pct:.2f}%")
+        write_csv(timestamps, args.output)
+    else:
+        timestamps = detect_scenes(args.video, threshold=args.threshold, noise_floor=args.noise_floor,
+                                   skip_seconds=args.skip, min_clip_seconds=args.min_clip, debug=args.debug,
+                                   downscale=args.downscale, batch=max(1, args.batch),
+                                   workers=args.workers, overlap_seconds=args.overlap,
+                                   output_path=args.output, resume=args.resume, max_jump_seconds=args.gallop)
 
     print(f"\nFound {len(timestamps)} frame changes after {args.skip}s:")
     for ts in timestamps:
         mins, secs = divmod(ts, 60)
         print(f"  {int(mins)}:{secs:06.3f}")
 
-    write_csv(timestamps, args.output)
-
 
 if __name__ == "__main__":
     main()
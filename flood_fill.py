@@ -0,0 +1,126 @@
+"""
+Scanline flood fill ("magic wand") over a boolean color mask.
+
+The pixels of the target color are found once with a vectorized comparison.
+The fill then works on whole horizontal runs of that mask instead of single
+pixels, so the Python loop runs once per run rather than once per pixel, and
+the selection is stored as a boolean array rather than a set of (x, y) tuples.
+
+Can be imported:
+    from flood_fill import magic_wand_select
+    selection = magic_wand_select(screen_arr, x, y, (225, 225, 225))
+    if selection is not None:
+        print(selection.count, selection.bounds)
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+
+# Stop filling after this many pixels so a uniform screen can't run away
+DEFAULT_MAX_PIXELS = 1_000_000
+
+# mask: boolean array covering bounds only (mask[0, 0] is (min_x, min_y))
+# bounds: (min_x, min_y, max_x, max_y), inclusive
+# count: number of selected pixels
+# truncated: True if the fill stopped at max_pixels
+Selection = namedtuple("Selection", ["mask", "bounds", "count", "truncated"])
+
+
+def color_mask(screen_arr, color):
+    """
+    Returns an (H, W) boolean array that is True where the pixel equals color.
+
+    Args:
+        screen_arr: The (H, W, 3) RGB numpy array.
+        color: The RGB tuple to match.
+    """
+    return ((screen_arr[:, :, 0] == color[0])
+            & (screen_arr[:, :, 1] == color[1])
+            & (screen_arr[:, :, 2] == color[2]))
+
+
+def _runs(row):
+    """Returns (starts, ends) of the True runs in a 1-D boolean array, ends exclusive."""
+    edges = np.diff(np.concatenate(([False], row, [False])).view(np.int8))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def flood_fill(mask, start_x, start_y, max_pixels=DEFAULT_MAX_PIXELS):
+    """
+    Selects the 4-connected region of True pixels in mask containing (start_x, start_y).
+
+    Args:
+        mask: An (H, W) boolean array, e.g. from color_mask.
+        start_x: The x coordinate to start the selection.
+        start_y: The y coordinate to start the selection.
+        max_pixels: Stop once at least this many pixels are selected (None for no limit).
+
+    Returns:
+        A Selection, or None if the start point is outside the mask or not set.
+    """
+    H, W = mask.shape
+    if start_x < 0 or start_x >= W or start_y < 0 or start_y >= H:
+        return None
+    if not mask[start_y, start_x]:
+        return None
+
+    selected = np.zeros((H, W), dtype=bool)
+    count = 0
+    truncated = False
+    min_x, min_y, max_x, max_y = start_x, start_y, start_x, start_y
+
+    seeds = [(start_x, start_y)]
+    while seeds:
+        x, y = seeds.pop()
+        if selected[y, x]:
+            continue
+
+        # Extend the seed to the full run of matching pixels on this row
+        row = mask[y]
+        left_gaps = np.flatnonzero(~row[:x])
+        left = left_gaps[-1] + 1 if left_gaps.size else 0
+        right_gaps = np.flatnonzero(~row[x:])
+        right = x + right_gaps[0] if right_gaps.size else W  # exclusive
+
+        selected[y, left:right] = True
+        count += right - left
+        min_x, max_x = min(min_x, left), max(max_x, right - 1)
+        min_y, max_y = min(min_y, y), max(max_y, y)
+
+        if max_pixels is not None and count >= max_pixels:
+            truncated = True
+            break
+
+        # Seed every unvisited run touching this one in the rows above and below
+        for ny in (y - 1, y + 1):
+            if 0 <= ny < H:
+                open_pixels = mask[ny, left:right] & ~selected[ny, left:right]
+                starts, _ = _runs(open_pixels)
+                seeds.extend((left + int(s), ny) for s in starts)
+
+    bounds = (int(min_x), int(min_y), int(max_x), int(max_y))
+    crop = selected[min_y:max_y + 1, min_x:max_x + 1].copy()
+    return Selection(crop, bounds, int(count), truncated)
+
+
+def magic_wand_select(screen_arr, start_x, start_y, target_color, max_pixels=DEFAULT_MAX_PIXELS):
+    """
+    Performs a magic wand (flood fill) selection on the screen starting from a point,
+    selecting all connected pixels of the exact target color.
+
+    Args:
+        screen_arr: The numpy array of the full screen (RGB).
+        start_x: The x coordinate to start the selection.
+        start_y: The y coordinate to start the selection.
+        target_color: The RGB tuple of the color to select.
+        max_pixels: Stop once at least this many pixels are selected (None for no limit).
+
+    Returns:
+        A Selection, or None if nothing was selected.
+    """
+    H, W, _ = screen_arr.shape
+    if start_x < 0 or start_x >= W or start_y < 0 or start_y >= H:
+        return None
+    return flood_fill(color_mask(screen_arr, target_color), start_x, start_y, max_pixels)
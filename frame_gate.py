@@ -0,0 +1,83 @@
+"""
+Change gating and adaptive polling for the screen watchers.
+
+FrameGate fingerprints the watched region each tick and reports whether it
+differs from the previous tick, so the expensive detectors can be skipped
+while nothing on screen has moved. AdaptiveInterval polls quickly right after
+a change (when more mail or UI updates are likely) and backs off while the
+screen stays static.
+
+Can be imported:
+    gate = FrameGate()
+    poll = AdaptiveInterval(min_seconds=1, max_seconds=10)
+    changed = gate.changed(frame.region(top_left, bottom_right))
+    sleep(poll.next(changed))
+"""
+
+import hashlib
+
+import numpy as np
+
+
+def region_fingerprint(rgb_arr):
+    """
+    Returns a short digest of every pixel in the region.
+
+    Hashing the full region (rather than a downsampled copy) means a change of
+    a single pixel, such as an unread badge digit, is never missed. The
+    watched regions are small, so this costs about a millisecond.
+
+    Args:
+        rgb_arr: An (H, W, 3) array; views are fine.
+    """
+    data = np.ascontiguousarray(rgb_arr)
+    digest = hashlib.blake2b(data.tobytes(), digest_size=16)
+    digest.update(str(data.shape).encode())
+    return digest.digest()
+
+
+class FrameGate:
+    """Remembers the last fingerprint of one region and reports changes."""
+
+    def __init__(self):
+        self._last = None
+
+    def changed(self, rgb_arr):
+        """
+        Fingerprints rgb_arr and compares it with the previous call.
+
+        Returns:
+            True on the first call, after reset(), or if any pixel differs.
+        """
+        if rgb_arr is None:
+            self._last = None
+            return True
+        fingerprint = region_fingerprint(rgb_arr)
+        changed = fingerprint != self._last
+        self._last = fingerprint
+        return changed
+
+    def reset(self):
+        """Forces the next call to changed() to report a change."""
+        self._last = None
+
+
+class AdaptiveInterval:
+    """
+    Polling interval that drops to min_seconds after a change and grows by
+    backoff each static tick, up to max_seconds.
+    """
+
+    def __init__(self, min_seconds=1.0, max_seconds=10.0, backoff=1.5):
+        self.min_seconds = min_seconds
+        self.max_seconds = max_seconds
+        self.backoff = backoff
+        self.current = min_seconds
+
+    def next(self, changed):
+        """Returns how long to sleep before the next tick."""
+        if changed:
+            self.current = self.min_seconds
+        else:
+            self.current = min(self.current * self.backoff, self.max_seconds)
+        return self.current
@@ -0,0 +1,86 @@
+"""
+Background mouse and keyboard activity tracking.
+
+pynput listeners run on their own threads and stamp the time of every mouse
+move, click, scroll and key press, so asking "has the user been idle for N
+seconds?" is an O(1) read instead of blocking while sampling the mouse.
+
+Can be imported:
+    tracker = InputTracker()
+    tracker.start()
+    if tracker.is_idle(10):
+        ...
+    with tracker.synthetic():
+        mouse.position = (x, y)     # our own input doesn't count as activity
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+from pynput import keyboard, mouse
+
+
+class InputTracker:
+    """
+    Keeps the time of the last real mouse or keyboard input.
+
+    Input generated inside a synthetic() block, plus a short grace period after
+    it (listener callbacks arrive slightly late), is ignored.
+    """
+
+    def __init__(self, synthetic_grace_seconds=0.25):
+        self.synthetic_grace_seconds = synthetic_grace_seconds
+        self._last_input = time.monotonic()
+        self._synthetic_depth = 0
+        self._ignore_until = 0.0
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def _on_input(self, *args):
+        now = time.monotonic()
+        if self._synthetic_depth or now < self._ignore_until:
+            return
+        self._last_input = now
+
+    def start(self):
+        """Starts the mouse and keyboard listener threads."""
+        if self._listeners:
+            return
+        self._listeners = [
+            mouse.Listener(on_move=self._on_input, on_click=self._on_input, on_scroll=self._on_input),
+            keyboard.Listener(on_press=self._on_input),
+        ]
+        for listener in self._listeners:
+            listener.daemon = True
+            listener.start()
+
+    def stop(self):
+        for listener in self._listeners:
+            listener.stop()
+        self._listeners = []
+
+    @property
+    def last_input(self):
+        """time.monotonic() of the last real input (or of when the tracker was made)."""
+        return self._last_input
+
+    def idle_seconds(self):
+        """Seconds since the last real mouse or keyboard input."""
+        return time.monotonic() - self._last_input
+
+    def is_idle(self, seconds):
+        """True if there has been no real input for at least this many seconds."""
+        return self.idle_seconds() >= seconds
+
+    @contextmanager
+    def synthetic(self):
+        """Ignore input events while the watcher itself moves the mouse or scrolls."""
+        with self._lock:
+            self._synthetic_depth += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._synthetic_depth -= 1
+                self._ignore_until = time.monotonic() + self.synthetic_grace_seconds
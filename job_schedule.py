@@ -0,0 +1,151 @@
+"""
+Loads critical_jobs_schedule.csv and keeps the reminder scheduler in step with it.
+
+The file is a header line followed by "name  start_time  end_time" rows, where
+the columns are separated by any mix of tabs and spaces. Each line is parsed
+with one regex match, and job names may themselves contain spaces.
+
+JobScheduleWatcher polls the file's mtime on a background thread. When the
+file changes it re-reads it, diffs the old and new job sets, and cancels or
+adds only the alerts of the jobs that were removed or added. Unchanged jobs
+keep their timers, so nothing is lost mid-shift.
+
+Can be imported:
+    from job_schedule import JobScheduleWatcher, csv_to_jobs_dict
+    watcher = JobScheduleWatcher("critical_jobs_schedule.csv", scheduler, schedule_job)
+    watcher.start()
+"""
+
+import os
+import re
+import threading
+
+JOBS_FILE = "critical_jobs_schedule.csv"
+
+# name, then two HH:MM times, separated by runs of tabs and/or spaces
+JOB_LINE = re.compile(r"^\s*(?P<name>\S.*?)\s+(?P<start_time>\d{1,2}:\d{2})\s+(?P<end_time>\d{1,2}:\d{2})\s*$")
+
+
+def csv_to_jobs_dict(filepath):
+    """
+    Converts a tab-delimited file into a list of job dictionaries.
+    Any run of tabs and spaces between columns counts as one separator.
+
+    Args:
+        filepath (str): Path to the tab-delimited file
+
+    Returns:
+        list: List of job dictionaries with "name", "start_time" and "end_time"
+    """
+    jobs = []
+    with open(filepath, 'r') as file:
+        # Skip header line
+        file.readline()
+        for line_number, line in enumerate(file, 2):
+            if not line.strip():
+                continue
+            match = JOB_LINE.match(line)
+            if match is None:
+                print(f"{filepath}:{line_number}: skipping unreadable line {line.rstrip()!r}")
+                continue
+            jobs.append(match.groupdict())
+    return jobs
+
+
+def _job_key(job):
+    return (job["name"], job["start_time"], job["end_time"])
+
+
+class JobScheduleWatcher:
+    """
+    Keeps one file's jobs scheduled, re-scheduling only what changed.
+
+    Args:
+        path: The schedule file.
+        scheduler: A DeadlineScheduler (anything with cancel(job)).
+        schedule_job: Called with a job dict; returns the scheduler Jobs
+            (alerts) it created, so they can be cancelled later.
+        interval: Seconds between mtime checks.
+    """
+
+    def __init__(self, path, scheduler, schedule_job, interval=5.0):
+        self.path = path
+        self.scheduler = scheduler
+        self.schedule_job = schedule_job
+        self.interval = interval
+        self._scheduled = {}  # (name, start_time, end_time) -> [scheduler Job, ...]
+        self._signature = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def jobs(self):
+        """The job dicts currently scheduled."""
+        return [dict(zip(("name", "start_time", "end_time"), key)) for key in self._scheduled]
+
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload(self):
+        """
+        Re-reads the file and applies the difference.
+
+        Returns:
+            (added, removed) counts of jobs.
+        """
+        self._signature = self._file_signature()
+        if self._signature is None:
+            print(f"{self.path} not found; keeping {len(self._scheduled)} scheduled jobs")
+            return 0, 0
+        try:
+            new_jobs = {_job_key(job): job for job in csv_to_jobs_dict(self.path)}
+        except OSError as e:
+            print(f"Couldn't read {self.path}: {e}")
+            return 0, 0
+
+        removed = [key for key in self._scheduled if key not in new_jobs]
+        added = [key for key in new_jobs if key not in self._scheduled]
+        for key in removed:
+            for alert in self._scheduled.pop(key):
+                self.scheduler.cancel(alert)
+            print("Removed job:", dict(zip(("name", "start_time", "end_time"), key)))
+        for key in added:
+            try:
+                self._scheduled[key] = list(self.schedule_job(new_jobs[key]))
+            except ValueError as e:  # e.g. a time like 25:00
+                print(f"Skipping job {new_jobs[key]}: {e}")
+                continue
+            print("Job:", new_jobs[key])
+        return len(added), len(removed)
+
+    def check(self):
+        """Reloads if the file changed since the last load. Returns True if it did."""
+        if self._file_signature() == self._signature:
+            return False
+        added, removed = self.reload()
+        print(f"Reloaded {self.path}: {added} added, {removed} removed, {len(self._scheduled)} scheduled")
+        return True
+
+    def start(self):
+        """Loads the file now, then watches it on a daemon thread."""
+        self.reload()
+        self._thread = threading.Thread(target=self._run, name="job-schedule-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                # Never let a bad edit kill the watcher; the old schedule stays in place
+                print(f"Error reloading {self.path}: {e}")
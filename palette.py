@@ -0,0 +1,91 @@
+"""
+Single-pass pixel classification against a small palette of exact colors.
+
+Used by the blue watcher to count Outlook's unread-indicator pixels. A
+256-entry lookup table (or a plain comparison, when the palette shares one
+value there) on the most selective channel throws away almost every pixel up
+front; the few survivors are packed into one integer each and looked
+up in the sorted palette. Adding colors only grows the sorted search, which is
+logarithmic, so the scan stays a single pass however long the palette gets.
+
+Can be imported:
+    from palette import PaletteClassifier
+    palette = PaletteClassifier([(0, 90, 176), (0, 90, 170)])
+    palette.counts(rgb_arr)     # -> array([12, 0])
+"""
+
+import numpy as np
+
+
+def _pack(r, g, b):
+    """Packs RGB channel values (scalars or arrays) into one uint32 each."""
+    return (np.asarray(r, dtype=np.uint32) << 16) | (np.asarray(g, dtype=np.uint32) << 8) | np.asarray(b, dtype=np.uint32)
+
+
+class PaletteClassifier:
+    """
+    Classifies RGB pixels against a fixed list of colors.
+
+    Attributes:
+        colors: The palette as a list of RGB tuples, in the order given.
+    """
+
+    def __init__(self, colors):
+        self.colors = [tuple(int(v) for v in color) for color in colors]
+        if not self.colors:
+            raise ValueError("Palette needs at least one color")
+
+        channels = np.array(self.colors, dtype=np.uint8)
+        packed = _pack(channels[:, 0], channels[:, 1], channels[:, 2])
+        self._keys, first = np.unique(packed, return_index=True)
+        # Palette index for each sorted key (duplicates map to their first entry)
+        self._key_index = first
+
+        # Prefilter on the channel whose palette values are the fewest distinct ones
+        self._channel = int(np.argmin([len(set(channels[:, c])) for c in range(3)]))
+        values = np.unique(channels[:, self._channel])
+        # A single value is a plain comparison, which is cheaper than a table lookup
+        self._value = int(values[0]) if len(values) == 1 else None
+        self._lut = np.zeros(256, dtype=bool)
+        self._lut[values] = True
+
+    def classify(self, rgb_arr):
+        """
+        Finds which palette color, if any, each pixel is.
+
+        Args:
+            rgb_arr: An (H, W, 3) uint8 RGB array (views are fine).
+
+        Returns:
+            (ys, xs, index): row and column of every pixel that is in the
+            palette, and the palette index of its color.
+        """
+        channel = rgb_arr[:, :, self._channel]
+        if self._value is not None:
+            ys, xs = np.nonzero(channel == self._value)
+        else:
+            ys, xs = np.nonzero(np.take(self._lut, channel))
+        pixels = rgb_arr[ys, xs]
+        packed = _pack(pixels[:, 0], pixels[:, 1], pixels[:, 2])
+
+        pos = np.searchsorted(self._keys, packed)
+        pos[pos == len(self._keys)] = 0
+        hit = self._keys[pos] == packed
+        return ys[hit], xs[hit], self._key_index[pos[hit]]
+
+    def counts(self, rgb_arr):
+        """
+        Counts the pixels of each palette color.
+
+        Args:
+            rgb_arr: An (H, W, 3) uint8 RGB array (views are fine).
+
+        Returns:
+            An int array with one count per palette color, in palette order.
+        """
+        _, _, index = self.classify(rgb_arr)
+        return np.bincount(index, minlength=len(self.colors))
+
+    def any(self, rgb_arr):
+        """True if any pixel in rgb_arr is a palette color."""
+        return bool(self.counts(rgb_arr).any())
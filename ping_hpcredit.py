@@ -3,18 +3,17 @@ import time
 import platform
 import tkinter as tk
 from tkinter import messagebox
-import pyttsx3
+from speech_queue import SpeechQueue, URGENT
 
-engine = pyttsx3.init()
+speech = SpeechQueue()
 def say(message):
-    """Uses text-to-speech to announce the alert message three times."""
-    # Say the message three times
-    for _ in range(3):
-        engine.say(message)
-        print(message)
-        engine.runAndWait()
-        engine.stop()
-        time.sleep(1) # A short pause between repetitions
+    """
+    Queues the alert message to be announced three times and returns at once.
+    Returns a Future that completes when the announcement has been spoken.
+    """
+    print(message)
+    # Say the message three times, with a short pause between repetitions
+    return speech.say(message, priority=URGENT, repeat=3, pause=1)
 
 def is_host_reachable(host: str) -> bool:
     """
@@ -1,83 +1,191 @@
 """
-Play a random Strong Bad email sound segment using Pygame.
-Reads scene_timestamps.csv to know the segment boundaries, then plays
-a random segment directly from the original audio file (no splitting needed).
-Uses only pygame for audio loading (supports WAV, MP3, OGG natively).
+Play a random Strong Bad email sound segment.
+Reads scene_timestamps.csv to know the segment boundaries (written by
+detect_scenes.py from the video, or by detect_audio_segments.py from the MP3
+itself), then plays a random segment of the original audio file (no
+splitting needed).
+
+The audio is decoded once into a raw PCM clip bank next to the MP3
+("<audio>.pcm.npy" plus a "<audio>.segments.json" segment table). After that,
+playing a clip is just a slice of a memory-mapped array handed to the shared
+audio mixer (audio_mixer.py), which reads it in place, so it starts almost
+immediately and doesn't block the caller.
+The PCM is decoded again automatically when the MP3 changes, and only the
+segment table is rewritten when the CSV changes; pygame is only needed for the
+decode step.
 
 Usage:
     python random_sb_sound.py              # play one random segment
     python random_sb_sound.py --list       # list all segments with times
+    python random_sb_sound.py --build      # (re)build the clip bank now
 
 Can also be imported:
     from random_sb_sound import play_random_clip
-    play_random_clip()
+    play_random_clip()                     # returns at once
 """
 
 import argparse
 import csv
+import json
+import os
 import random
-import time
 
-import pygame
+import numpy as np
+
+from audio_mixer import NORMAL, get_mixer
 
 
 AUDIO_FILE = "strong bad email songs.mp3"
 CSV_FILE = "scene_timestamps.csv"
+VOLUME = 0.25
 
-# Cache total duration to avoid reloading
-_duration_cache = {}
-
+# Loaded clip banks, keyed by audio path
+_bank_cache = {}
 
-def _get_duration(audio_path):
-    """Get total duration of audio file via pygame.mixer.Sound."""
-    if audio_path in _duration_cache:
-        return _duration_cache[audio_path]
 
-    pygame.mixer.init()
-    sound = pygame.mixer.Sound(audio_path)
-    total_seconds = sound.get_length()
-    del sound
-    pygame.mixer.quit()
+def _bank_paths(audio_path):
+    """Returns the (pcm, segment table) paths that belong to an audio file."""
+    return audio_path + ".pcm.npy", audio_path + ".segments.json"
 
-    _duration_cache[audio_path] = total_seconds
-    return total_seconds
 
-
-def load_segments(csv_path=CSV_FILE, audio_path=AUDIO_FILE):
-    """Load timestamps from CSV and pair them into (start, end) segments."""
+def _read_timestamps(csv_path):
+    """Reads the sorted segment start times (seconds) from the CSV."""
     timestamps = []
     with open(csv_path, "r") as f:
         reader = csv.DictReader(f)
         for row in reader:
             timestamps.append(float(row["timestamp_seconds"]))
     timestamps.sort()
+    return timestamps
+
+
+def build_clip_bank(audio_path=AUDIO_FILE, csv_path=CSV_FILE):
+    """
+    Decodes the whole audio file once into int16 PCM and writes it, with the
+    segment table, next to the audio file.
+
+    Returns:
+        The segment table dict that was written.
+    """
+    import pygame
 
-    total_seconds = _get_duration(audio_path)
+    pcm_path, table_path = _bank_paths(audio_path)
+
+    pygame.mixer.init()
+    try:
+        sample_rate, _, channels = pygame.mixer.get_init()
+        sound = pygame.mixer.Sound(audio_path)
+        pcm = pygame.sndarray.array(sound)
+        del sound
+    finally:
+        pygame.mixer.quit()
+
+    if pcm.ndim == 1:
+        pcm = pcm[:, np.newaxis]
+    np.save(pcm_path, np.ascontiguousarray(pcm, dtype=np.int16))
+
+    table = write_segment_table(audio_path, csv_path, sample_rate, pcm.shape)
+    print(f"Built clip bank {pcm_path} ({table['total_seconds']:.1f}s, {len(table['segments'])} segments)")
+    return table
+
+
+def write_segment_table(audio_path, csv_path, sample_rate, pcm_shape):
+    """
+    Writes the segment table for an already decoded clip bank. Only this needs
+    redoing when the CSV changes; the PCM depends on the audio file alone.
+
+    Args:
+        sample_rate: Sample rate of the bank's PCM.
+        pcm_shape: (frames, channels) of the bank's PCM.
+
+    Returns:
+        The segment table dict that was written.
+    """
+    _, table_path = _bank_paths(audio_path)
+    total_frames = pcm_shape[0]
+    total_seconds = total_frames / sample_rate
+    timestamps = _read_timestamps(csv_path)
 
     segments = []
     for i in range(len(timestamps)):
         start = timestamps[i]
         end = timestamps[i + 1] if i + 1 < len(timestamps) else total_seconds
-        segments.append((start, end))
+        segments.append({
+            "start": start,
+            "end": end,
+            "start_frame": min(int(round(start * sample_rate)), total_frames),
+            "end_frame": min(int(round(end * sample_rate)), total_frames),
+        })
+
+    table = {
+        "sample_rate": sample_rate,
+        "channels": pcm_shape[1],
+        "total_seconds": total_seconds,
+        "audio_mtime_ns": os.stat(audio_path).st_mtime_ns,
+        "csv_mtime_ns": os.stat(csv_path).st_mtime_ns,
+        "segments": segments,
+    }
+    with open(table_path, "w") as f:
+        json.dump(table, f, indent=1)
+    return table
+
+
+def _load_bank(audio_path, csv_path):
+    """
+    Returns (table, pcm) for the audio file. pcm is memory-mapped. The PCM is
+    decoded again only if it is missing or older than the audio file; if just
+    the CSV changed, only the segment table is rewritten.
+    """
+    pcm_path, table_path = _bank_paths(audio_path)
+    audio_mtime = os.stat(audio_path).st_mtime_ns
+    csv_mtime = os.stat(csv_path).st_mtime_ns
+
+    cached = _bank_cache.get(audio_path)
+    if cached is not None:
+        table, _ = cached
+        if table["audio_mtime_ns"] == audio_mtime and table["csv_mtime_ns"] == csv_mtime:
+            return cached
+
+    table = None
+    if os.path.exists(pcm_path) and os.path.exists(table_path):
+        with open(table_path, "r") as f:
+            table = json.load(f)
+        if table["audio_mtime_ns"] != audio_mtime:
+            table = None
+    if table is None:
+        table = build_clip_bank(audio_path, csv_path)
+
+    pcm = np.load(pcm_path, mmap_mode="r")
+    if table["csv_mtime_ns"] != csv_mtime:
+        # New boundaries for the same audio: the PCM is still good
+        table = write_segment_table(audio_path, csv_path, table["sample_rate"], pcm.shape)
+    _bank_cache[audio_path] = (table, pcm)
+    return table, pcm
+
 
-    return segments
+def load_segments(csv_path=CSV_FILE, audio_path=AUDIO_FILE):
+    """Load timestamps from CSV and pair them into (start, end) segments."""
+    table, _ = _load_bank(audio_path, csv_path)
+    return [(segment["start"], segment["end"]) for segment in table["segments"]]
 
 
-def play_random_clip(audio_path=AUDIO_FILE, csv_path=CSV_FILE):
-    """Play a random segment from the audio file. Returns (index, start, end)."""
-    segments = load_segments(csv_path, audio_path)
+def play_random_clip(audio_path=AUDIO_FILE, csv_path=CSV_FILE, blocking=False, priority=NORMAL):
+    """
+    Play a random segment from the audio file. Returns (index, start, end).
+
+    Playback runs in the background unless blocking is True.
+    """
+    table, pcm = _load_bank(audio_path, csv_path)
+    segments = table["segments"]
     idx = random.randrange(len(segments))
-    start, end = segments[idx]
-    duration = end - start
+    segment = segments[idx]
 
-    pygame.mixer.init()
-    pygame.mixer.music.load(audio_path)
-    pygame.mixer.music.set_volume(0.25)
-    pygame.mixer.music.play(start=start)
-    time.sleep(duration)
-    pygame.mixer.music.stop()
-    pygame.mixer.quit()
-    return idx + 1, start, end
+    # Slicing the memory map reads just this clip's pages from disk, as the mixer plays them
+    clip = pcm[segment["start_frame"]:segment["end_frame"]]
+    voice = get_mixer().play(clip, volume=VOLUME, priority=priority, sample_rate=table["sample_rate"])
+    if blocking:
+        voice.wait()
+    return idx + 1, segment["start"], segment["end"]
 
 
 def main():
@@ -85,8 +193,13 @@ def main():
     parser.add_argument("--audio", default=AUDIO_FILE, help="Audio file (WAV or MP3)")
     parser.add_argument("--csv", default=CSV_FILE, help="CSV file with timestamps")
     parser.add_argument("--list", action="store_true", help="List all segments without playing")
+    parser.add_argument("--build", action="store_true", help="Rebuild the PCM clip bank and exit")
     args = parser.parse_args()
 
+    if args.build:
+        build_clip_bank(args.audio, args.csv)
+        return
+
     segments = load_segments(args.csv, args.audio)
 
     if args.list:
@@ -96,7 +209,7 @@ def main():
             print(f"  #{i:3d}: {start:7.3f}s - {end:7.3f}s  ({duration:.2f}s)")
         return
 
-    num, start, end = play_random_clip(args.audio, args.csv)
+    num, start, end = play_random_clip(args.audio, args.csv, blocking=True)
     print(f"Played segment #{num}: {start:.3f}s - {end:.3f}s ({end - start:.2f}s)")
 
 
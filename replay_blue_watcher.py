@@ -0,0 +1,236 @@
+"""
+Headless replay and benchmark for the blue watcher's detection pipeline.
+
+Feeds recorded frames (.npy/.png) or synthetic frames built from the images/
+templates through count_blue_pixels, inbox_button_exists and the unread-color
+check, and reports the latency and peak memory of each stage for every frame.
+Runs without a screen, so the hot path can be profiled and regression-tested
+on a build box, and engine changes can be compared on identical inputs.
+
+Usage:
+    python replay_blue_watcher.py --synthetic 30
+    python replay_blue_watcher.py --frames "recordings/*.npy" --region 0,0,400,1000
+    python replay_blue_watcher.py --synthetic 30 --csv before.csv
+    python replay_blue_watcher.py --record recordings --count 20 --interval 10   # on the desktop
+
+Outputs: a per-frame table, a per-stage summary and optionally a CSV.
+"""
+
+import argparse
+import contextlib
+import csv
+import glob
+import io
+import os
+import statistics
+import time
+import tracemalloc
+
+import numpy as np
+
+from blue_detectors import (INBOX_HIGHLIGHTED_BG_COLOR, UNREAD_COLORS, _check_for_unread_colors,
+                            count_blue_pixels, inbox_button_exists, inbox_matcher)
+from screen_capture import Frame, ReplayFrameSource
+from template_match import templates
+
+STAGES = ["grab", "count", "inbox", "unread"]
+
+# Layout of the synthetic Outlook window
+PANE_WIDTH = 320
+INBOX_POS = (24, 180)
+
+
+def synthetic_frames(count, width=1920, height=1080, seed=0):
+    """
+    Builds frames that look enough like Outlook for every detector to do real
+    work: a folder pane with the inbox button, an unread badge that grows now
+    and then, a highlighted inbox on some frames and a noisy message list.
+
+    Returns:
+        A list of Frame objects.
+    """
+    rng = np.random.default_rng(seed)
+    inbox = templates.get("images/inbox.png").rgb
+    highlighted = templates.get("images/inbox_highlighted.png").rgb
+
+    base = np.full((height, width, 3), 255, dtype=np.uint8)
+    base[:, :PANE_WIDTH] = (225, 225, 225)  # folder pane
+    base[:40] = (0, 114, 198)  # ribbon
+    for row in range(80, height, 22):
+        cols = rng.integers(PANE_WIDTH + 10, width, size=width // 5)
+        base[row:row + 9, cols] = rng.integers(0, 120, size=(9, cols.size, 3), dtype=np.uint8)
+
+    frames = []
+    unread = 0
+    for i in range(count):
+        rgb = base.copy()
+        x, y = INBOX_POS
+        if i % 7 == 6:
+            # Inbox selected: highlighted background band behind the button
+            h, w, _ = highlighted.shape
+            rgb[y - 6:y + h + 6, :PANE_WIDTH] = INBOX_HIGHLIGHTED_BG_COLOR
+            rgb[y:y + h, x:x + w] = highlighted
+        else:
+            h, w, _ = inbox.shape
+            rgb[y:y + h, x:x + w] = inbox
+        if i % 3 == 2:
+            unread += 1
+        # Unread badge: one small block per unread message, right of the button
+        for n in range(unread):
+            bx = x + w + 8 + 6 * n
+            rgb[y + 3:y + 12, bx:bx + 4] = UNREAD_COLORS[n % len(UNREAD_COLORS)]
+        frames.append(Frame.from_rgb(rgb))
+    return frames
+
+
+def _measure(stats, stage, memory, fn, *args):
+    """Runs fn(*args), recording its latency (ms) and peak extra memory (KiB) in stats."""
+    if memory:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    result = fn(*args)
+    stats[f"{stage}_ms"] = (time.perf_counter() - start) * 1000
+    if memory:
+        stats[f"{stage}_kib"] = (tracemalloc.get_traced_memory()[1] - baseline) / 1024
+    return result
+
+
+def replay(source, region_top_left, region_bottom_right, memory=True, verbose=False):
+    """
+    Runs every frame from source through the detectors.
+
+    Args:
+        source: A ReplayFrameSource (or anything with the same grab()).
+        region_top_left: A 2-tuple (x, y) of the watched region's top-left.
+        region_bottom_right: A 2-tuple (x, y) of the watched region's bottom-right.
+        memory: If True, also record peak memory per stage with tracemalloc.
+        verbose: If True, let the detectors' own prints through.
+
+    Returns:
+        A list of per-frame dicts with results and stage timings.
+    """
+    rows = []
+    if memory:
+        tracemalloc.start()
+    try:
+        for index in range(len(source)):
+            stats = {"frame": index}
+            output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+            with output:
+                frame = _measure(stats, "grab", memory, source.grab)
+                stats["blue_pixels"] = _measure(stats, "count", memory, count_blue_pixels,
+                                                frame, region_top_left, region_bottom_right)
+                stats["inbox_found"], stats["has_unread"] = _measure(
+                    stats, "inbox", memory, inbox_button_exists, frame, region_top_left, region_bottom_right)
+                box = frame.clip(region_top_left, region_bottom_right)
+                bounds = (box[0], box[1], box[2] - 1, box[3] - 1) if box else None
+                stats["region_unread"] = _measure(stats, "unread", memory, _check_for_unread_colors,
+                                                  frame.rgb, bounds)
+            rows.append(stats)
+    finally:
+        if memory:
+            tracemalloc.stop()
+    return rows
+
+
+def print_report(rows, memory):
+    """Prints the per-frame table and the per-stage summary."""
+    header = f"{'frame':>5} {'blue':>6} {'inbox':>5} {'unread':>6} " + " ".join(f"{s + ' ms':>9}" for s in STAGES)
+    if memory:
+        header += " " + " ".join(f"{s + ' KiB':>10}" for s in STAGES)
+    print(header)
+    for row in rows:
+        line = (f"{row['frame']:>5} {row['blue_pixels']:>6} {str(row['inbox_found']):>5} "
+                f"{str(row['has_unread']):>6} " + " ".join(f"{row[s + '_ms']:>9.2f}" for s in STAGES))
+        if memory:
+            line += " " + " ".join(f"{row[s + '_kib']:>10.0f}" for s in STAGES)
+        print(line)
+
+    print(f"\nSummary over {len(rows)} frames:")
+    for stage in STAGES:
+        times = [row[f"{stage}_ms"] for row in rows]
+        line = (f"  {stage:<7} mean {statistics.mean(times):8.2f} ms  median {statistics.median(times):8.2f} ms"
+                f"  max {max(times):8.2f} ms")
+        if memory:
+            line += f"  peak {max(row[f'{stage}_kib'] for row in rows):8.0f} KiB"
+        print(line)
+    stats = inbox_matcher.stats
+    print(f"  inbox search: {stats['hits']} at last position, {stats['near_hits']} nearby, "
+          f"{stats['misses']} full searches ({stats['fast_ratio']:.0%} fast path)")
+    if memory:
+        print("  (timings include tracemalloc overhead; use --no-memory for clean latency)")
+
+
+def write_report_csv(rows, output_path):
+    with open(output_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Wrote {len(rows)} frames to {output_path}")
+
+
+def record(output_dir, count, interval, monitor_index=1):
+    """Grabs frames from the live desktop into output_dir as .npy files for later replay."""
+    from screen_capture import CaptureSession
+
+    os.makedirs(output_dir, exist_ok=True)
+    with CaptureSession(monitor_index) as capture:
+        for i in range(count):
+            path = os.path.join(output_dir, f"frame_{i:04d}.npy")
+            capture.grab().save(path)
+            print(f"Saved {path}")
+            if i + 1 < count:
+                time.sleep(interval)
+
+
+def _parse_region(text):
+    x1, y1, x2, y2 = (int(v) for v in text.split(","))
+    return (x1, y1), (x2, y2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay frames through the blue watcher detectors")
+    source_group = parser.add_mutually_exclusive_group(required=True)
+    source_group.add_argument("--frames", help="Glob of recorded .npy/.png frames to replay")
+    source_group.add_argument("--synthetic", type=int, metavar="N", help="Replay N synthetic frames")
+    source_group.add_argument("--record", metavar="DIR", help="Record live frames into DIR instead")
+    parser.add_argument("--region", help="Watched region as x1,y1,x2,y2 (default: synthetic folder pane or whole frame)")
+    parser.add_argument("--width", type=int, default=1920, help="Synthetic frame width (default 1920)")
+    parser.add_argument("--height", type=int, default=1080, help="Synthetic frame height (default 1080)")
+    parser.add_argument("--count", type=int, default=10, help="Frames to record (default 10)")
+    parser.add_argument("--interval", type=float, default=10.0, help="Seconds between recorded frames (default 10)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip tracemalloc memory tracking")
+    parser.add_argument("--verbose", action="store_true", help="Show the detectors' own output")
+    parser.add_argument("--csv", help="Also write per-frame results and timings to this CSV")
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record, args.count, args.interval)
+        return
+
+    if args.synthetic is not None:
+        if args.synthetic < 1:
+            parser.error("--synthetic needs at least 1 frame")
+        frames = synthetic_frames(args.synthetic, args.width, args.height)
+        default_region = ((0, 0), (PANE_WIDTH, args.height))
+    else:
+        frames = sorted(glob.glob(args.frames))
+        if not frames:
+            parser.error(f"No frames match {args.frames}")
+        first = Frame.load(frames[0])
+        default_region = ((first.left, first.top), (first.left + first.width, first.top + first.height))
+
+    region_top_left, region_bottom_right = _parse_region(args.region) if args.region else default_region
+    print(f"Replaying {len(frames)} frames, region {region_top_left} -> {region_bottom_right}")
+
+    memory = not args.no_memory
+    rows = replay(ReplayFrameSource(frames), region_top_left, region_bottom_right,
+                  memory=memory, verbose=args.verbose)
+    print_report(rows, memory)
+    if args.csv:
+        write_report_csv(rows, args.csv)
+
+
+if __name__ == "__main__":
+    main()
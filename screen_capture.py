@@ -0,0 +1,286 @@
+"""
+One persistent screen-capture session for the screen watchers.
+
+The monitor is grabbed once per tick and every detector reads that same frame.
+Region crops are NumPy views into the raw BGRA buffer mss hands back, so no
+pixels are copied or converted: Frame.rgb reorders the channels with a
+negative stride instead of going through Image.frombytes.
+
+ReplayFrameSource has the same grab() interface but plays back recorded
+.png/.npy frames (or frames built in memory), so the detectors can be run on a
+machine without a screen.
+
+Usage:
+    capture = CaptureSession()          # primary monitor
+    frame = capture.grab()              # once per tick
+    region = frame.region(top_left, bottom_right)   # (h, w, 3) RGB view
+
+    replay = ReplayFrameSource(sorted(glob.glob("frames/*.npy")))
+    frame = replay.grab()
+"""
+
+import time
+
+import mss
+import numpy as np
+
+
+class Frame:
+    """
+    A single capture of a monitor.
+
+    Attributes:
+        bgra: The (H, W, 4) uint8 view of the raw BGRA buffer.
+        rgb: The (H, W, 3) RGB view of the same buffer (no copy).
+        left: Screen x coordinate of the frame's left edge.
+        top: Screen y coordinate of the frame's top edge.
+        timestamp: time.monotonic() when the frame was grabbed.
+    """
+
+    def __init__(self, bgra, left=0, top=0, timestamp=None):
+        self.bgra = bgra
+        self.rgb = bgra[:, :, 2::-1]
+        self.left = left
+        self.top = top
+        self.timestamp = timestamp
+
+    @classmethod
+    def from_screenshot(cls, shot, timestamp=None):
+        """Wraps an mss ScreenShot without copying its pixels."""
+        bgra = np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+        return cls(bgra, left=shot.left, top=shot.top, timestamp=timestamp)
+
+    @classmethod
+    def from_rgb(cls, rgb, left=0, top=0, timestamp=None):
+        """Builds a frame from an (H, W, 3) RGB array (copies into a BGRA buffer)."""
+        bgra = np.empty((rgb.shape[0], rgb.shape[1], 4), dtype=np.uint8)
+        bgra[:, :, 2::-1] = rgb
+        bgra[:, :, 3] = 255
+        return cls(bgra, left=left, top=top, timestamp=timestamp)
+
+    @classmethod
+    def load(cls, path, left=0, top=0):
+        """
+        Loads a recorded frame. .npy files hold an (H, W, 4) BGRA array as
+        written by save(), or an (H, W, 3) RGB array; anything else is opened
+        with Pillow.
+        """
+        if str(path).lower().endswith(".npy"):
+            arr = np.load(path)
+            if arr.ndim == 3 and arr.shape[2] == 4:
+                return cls(arr, left=left, top=top)
+            return cls.from_rgb(arr, left=left, top=top)
+
+        from PIL import Image
+
+        with Image.open(path) as img:
+            return cls.from_rgb(np.array(img.convert("RGB")), left=left, top=top)
+
+    def save(self, path):
+        """Writes the raw BGRA pixels to a .npy file for later replay."""
+        np.save(path, self.bgra)
+
+    @property
+    def width(self):
+        return self.bgra.shape[1]
+
+    @property
+    def height(self):
+        return self.bgra.shape[0]
+
+    def contains(self, x, y):
+        """True if the screen point (x, y) lies inside this frame."""
+        return (self.left <= x < self.left + self.width
+                and self.top <= y < self.top + self.height)
+
+    def to_frame_xy(self, x, y):
+        """Converts screen coordinates to (column, row) indexes into this frame."""
+        return (int(x) - self.left, int(y) - self.top)
+
+    def clip(self, region_top_left, region_bottom_right):
+        """
+        Converts a screen-coordinate rectangle to frame indexes, clipped to the frame.
+
+        Returns:
+            (x1, y1, x2, y2) frame indexes, or None if nothing is left after clipping.
+        """
+        x1, y1 = self.to_frame_xy(*region_top_left)
+        x2, y2 = self.to_frame_xy(*region_bottom_right)
+        x1, y1 = max(x1, 0), max(y1, 0)
+        x2, y2 = min(x2, self.width), min(y2, self.height)
+        if x2 <= x1 or y2 <= y1:
+            return None
+        return (x1, y1, x2, y2)
+
+    def region(self, region_top_left, region_bottom_right):
+        """
+        Crops a screen-coordinate rectangle out of the frame.
+
+        Args:
+            region_top_left: A 2-tuple (x, y) of the top-left screen coordinates.
+            region_bottom_right: A 2-tuple (x, y) of the bottom-right screen coordinates.
+
+        Returns:
+            An (h, w, 3) RGB view, or None if the rectangle is empty or lies
+            outside the frame.
+        """
+        box = self.clip(region_top_left, region_bottom_right)
+        if box is None:
+            return None
+        x1, y1, x2, y2 = box
+        return self.rgb[y1:y2, x1:x2]
+
+
+class CaptureSession:
+    """
+    Keeps one mss instance open for the life of the watcher.
+
+    One session can grab any monitor; monitor indexes follow mss (1 is the
+    primary monitor, 0 is the bounding box of all of them).
+
+    mss handles are tied to the thread that created them, so create and use a
+    session from the same thread.
+    """
+
+    def __init__(self, monitor_index=1):
+        self._sct = mss.mss()
+        self.monitor_index = monitor_index
+        self.monitor = self._sct.monitors[monitor_index]
+        self.frame = None
+
+    @property
+    def monitor_count(self):
+        """Number of physical monitors (valid indexes are 1..monitor_count)."""
+        return len(self._sct.monitors) - 1
+
+    def monitor_index_at(self, x, y):
+        """Returns the index of the monitor containing screen point (x, y), or None."""
+        for index, m in enumerate(self._sct.monitors[1:], start=1):
+            if m["left"] <= x < m["left"] + m["width"] and m["top"] <= y < m["top"] + m["height"]:
+                return index
+        return None
+
+    def monitor_index_for(self, region_top_left, region_bottom_right):
+        """
+        Picks the monitor to grab for a screen-coordinate rectangle.
+
+        Returns:
+            The index of the monitor holding the whole rectangle, 0 (the
+            bounding box of all monitors) if it spans several, or None if it
+            lies on no monitor at all.
+        """
+        (x1, y1), (x2, y2) = region_top_left, region_bottom_right
+        index = self.monitor_index_at(x1, y1)
+        if index is not None:
+            (_, _), (right, bottom) = self.bounds_of(index)
+            if x2 <= right and y2 <= bottom:
+                return index
+        for m in self._sct.monitors[1:]:
+            if (x1 < m["left"] + m["width"] and m["left"] < x2
+                    and y1 < m["top"] + m["height"] and m["top"] < y2):
+                return 0
+        return None
+
+    def refresh_monitors(self):
+        """
+        Re-reads the monitor layout, which mss only reads when the session opens.
+
+        Returns:
+            True if a monitor was added, removed, moved or resized.
+        """
+        old_monitors = self._sct.monitors
+        self._sct.close()
+        self._sct = mss.mss()
+        if self.monitor_index > self.monitor_count:
+            self.monitor_index = 1
+        self.monitor = self._sct.monitors[self.monitor_index]
+        return self._sct.monitors != old_monitors
+
+    def grab(self, monitor_index=None):
+        """
+        Captures a monitor and returns the new Frame.
+
+        Args:
+            monitor_index: Which monitor to grab (default: the session's monitor).
+                Only grabs of the session's own monitor are kept as .frame.
+        """
+        if monitor_index is None or monitor_index == self.monitor_index:
+            shot = self._sct.grab(self.monitor)
+            self.frame = Frame.from_screenshot(shot, timestamp=time.monotonic())
+            return self.frame
+        shot = self._sct.grab(self._sct.monitors[monitor_index])
+        return Frame.from_screenshot(shot, timestamp=time.monotonic())
+
+    def bounds_of(self, monitor_index=None):
+        """A monitor's ((left, top), (right, bottom)) in screen coordinates."""
+        m = self.monitor if monitor_index is None else self._sct.monitors[monitor_index]
+        return ((m["left"], m["top"]), (m["left"] + m["width"], m["top"] + m["height"]))
+
+    @property
+    def bounds(self):
+        """The session monitor's ((left, top), (right, bottom)) in screen coordinates."""
+        return self.bounds_of()
+
+    def close(self):
+        self._sct.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ReplayFrameSource:
+    """
+    Plays back recorded frames through the same grab() interface as
+    CaptureSession.
+
+    Args:
+        frames: Frame objects and/or paths to .npy/.png files, in order.
+        loop: If True, start over after the last frame instead of raising EOFError.
+    """
+
+    def __init__(self, frames, loop=False):
+        self._frames = list(frames)
+        self.loop = loop
+        self._index = 0
+        self.frame = None
+        if not self._frames:
+            raise ValueError("No frames to replay")
+
+    def __len__(self):
+        return len(self._frames)
+
+    def grab(self):
+        """Returns the next Frame (also kept as .frame)."""
+        if self._index >= len(self._frames):
+            if not self.loop:
+                raise EOFError("No more frames to replay")
+            self._index = 0
+        item = self._frames[self._index]
+        self._index += 1
+        frame = item if isinstance(item, Frame) else Frame.load(item)
+        frame.timestamp = time.monotonic()
+        self.frame = frame
+        return frame
+
+    @property
+    def bounds(self):
+        """The ((left, top), (right, bottom)) of the current (or first) frame."""
+        frame = self.frame or self._peek()
+        return ((frame.left, frame.top), (frame.left + frame.width, frame.top + frame.height))
+
+    def _peek(self):
+        """Loads the first frame without advancing playback."""
+        item = self._frames[0]
+        return item if isinstance(item, Frame) else Frame.load(item)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
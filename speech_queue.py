@@ -0,0 +1,179 @@
+"""
+Non-blocking text-to-speech for the watcher scripts.
+
+A single worker thread owns the pyttsx3 engine and speaks utterances taken
+from a bounded priority queue, so callers never wait for speech to finish.
+Identical utterances close together are collapsed into one: five "You've got
+mail!" alerts in a row are spoken once, and all five callers get the same
+future back, whether the first one is still waiting, being spoken, or was
+spoken moments ago.
+
+Can be imported:
+    from speech_queue import SpeechQueue, URGENT
+    speech = SpeechQueue()
+    future = speech.say("You've got mail!")
+    speech.say("HP credit is back up!", priority=URGENT, repeat=3, pause=1)
+    future.result()     # only if you really want to wait
+"""
+
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import nullcontext
+
+import pyttsx3
+
+# Lower numbers are spoken first
+URGENT = 0
+NORMAL = 5
+LOW = 9
+
+
+def _load_duck():
+    """
+    Returns audio_mixer.duck, or a no-op context manager if the mixer can't be
+    loaded (no sounddevice or PortAudio), so speech never depends on it.
+    """
+    try:
+        from audio_mixer import duck
+    except (ImportError, OSError) as e:
+        print(f"Speech won't turn down other audio: {e}")
+        return nullcontext
+    return duck
+
+
+class _Utterance:
+    def __init__(self, text, repeat, pause):
+        self.text = text
+        self.repeat = repeat
+        self.pause = pause
+        self.future = Future()
+        self.queued_at = time.monotonic()
+        self.started = False
+        self.finished_at = None
+
+
+class SpeechQueue:
+    """
+    Speaks queued utterances on a background thread.
+
+    Args:
+        maxsize: Most utterances waiting at once; say() fails the returned
+            future with queue.Full beyond that.
+        coalesce_seconds: A say() of text that was queued less than this long
+            ago, is being spoken, or finished less than this long ago returns
+            that utterance's future instead of queueing it again.
+        rate: Optional pyttsx3 speaking rate (words per minute).
+    """
+
+    def __init__(self, maxsize=16, coalesce_seconds=5.0, rate=None):
+        self.coalesce_seconds = coalesce_seconds
+        self.rate = rate
+        self._queue = queue.PriorityQueue(maxsize=maxsize)
+        self._pending = {}  # (text, repeat, pause) -> latest queued, spoken or just-spoken _Utterance
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+        self._thread = threading.Thread(target=self._run, name="speech", daemon=True)
+        self._thread.start()
+
+    def say(self, text, priority=NORMAL, repeat=1, pause=0.0):
+        """
+        Queues text to be spoken and returns immediately.
+
+        Args:
+            text: What to say.
+            priority: URGENT, NORMAL, LOW or any int; lower is spoken sooner.
+            repeat: How many times to say it.
+            pause: Seconds of silence between repetitions.
+
+        Returns:
+            A concurrent.futures.Future that completes once the text was spoken.
+        """
+        key = (text, repeat, pause)
+        with self._lock:
+            now = time.monotonic()
+            self._forget_expired(now)
+            previous = self._pending.get(key)
+            if previous is not None and self._coalesces(previous, now):
+                return previous.future
+
+            utterance = _Utterance(text, repeat, pause)
+            try:
+                self._queue.put_nowait((priority, next(self._counter), utterance))
+            except queue.Full as e:
+                utterance.future.set_exception(e)
+                return utterance.future
+            self._pending[key] = utterance
+        return utterance.future
+
+    def _coalesces(self, utterance, now):
+        """True if a repeat of utterance's text at now should share its future."""
+        if utterance.finished_at is not None:
+            return now - utterance.finished_at < self.coalesce_seconds
+        return utterance.started or now - utterance.queued_at < self.coalesce_seconds
+
+    def _forget_expired(self, now):
+        """Drops spoken utterances whose coalescing window has passed. Called with the lock held."""
+        expired = [key for key, utterance in self._pending.items()
+                   if utterance.finished_at is not None and now - utterance.finished_at >= self.coalesce_seconds]
+        for key in expired:
+            del self._pending[key]
+
+    def _forget(self, utterance):
+        key = (utterance.text, utterance.repeat, utterance.pause)
+        with self._lock:
+            if self._pending.get(key) is utterance:
+                del self._pending[key]
+
+    def _run(self):
+        # Imported here so importing speech_queue doesn't need PortAudio
+        duck = _load_duck()
+        # The engine must be created and used on this thread
+        try:
+            engine = pyttsx3.init()
+            if self.rate is not None:
+                engine.setProperty("rate", self.rate)
+        except Exception as e:
+            print(f"Error starting text-to-speech engine: {e}")
+            engine, init_error = None, e
+
+        while True:
+            _, _, utterance = self._queue.get()
+            if utterance is None:
+                break
+            if not utterance.future.set_running_or_notify_cancel():
+                self._forget(utterance)
+                continue
+            if engine is None:
+                # Keep draining the queue so callers get the error instead of waiting forever
+                self._forget(utterance)
+                utterance.future.set_exception(init_error)
+                continue
+            with self._lock:
+                # Stays in _pending while spoken, so repeats arriving now share this future
+                utterance.started = True
+            try:
+                for i in range(utterance.repeat):
+                    if i:
+                        time.sleep(utterance.pause)
+                    engine.say(utterance.text)
+                    # Turn down chords and clips while speaking so the words are heard
+                    with duck():
+                        engine.runAndWait()
+                    engine.stop()
+            except Exception as e:
+                print(f"Error speaking {utterance.text!r}: {e}")
+                # A failure isn't coalesced: the next say() tries again
+                self._forget(utterance)
+                utterance.future.set_exception(e)
+            else:
+                with self._lock:
+                    utterance.finished_at = time.monotonic()
+                utterance.future.set_result(utterance.text)
+
+    def close(self, timeout=None):
+        """Lets already queued speech finish, then stops the worker thread."""
+        self._queue.put((float("inf"), next(self._counter), None))
+        self._thread.join(timeout)
@@ -0,0 +1,425 @@
+"""
+Exact-pixel template matching for the screen watchers.
+
+Finds where a small RGB needle image (e.g. images/inbox.png) appears in a
+larger screen capture. Instead of comparing the needle at every (x, y) offset,
+the offsets whose pixels match a few distinctive needle pixels are found with
+vectorized comparisons, and only those surviving candidates are compared in
+full (with each pixel packed into a single integer). Results are identical to the
+brute-force scan: the first match in row-major (y, then x) order.
+
+Usage:
+    python template_match.py --bench                       # full-screen benchmark
+    python template_match.py --bench --needle images/inbox.png --width 1920 --height 1080
+
+Can also be imported:
+    from template_match import find_exact_match, templates
+    find_exact_match(haystack_arr, needle_arr, return_position=True)
+    find_template(haystack_arr, templates.get("images/inbox.png"), return_position=True)
+"""
+
+import argparse
+import glob
+import hashlib
+import os
+import time
+
+import numpy as np
+
+
+# How many distinctive needle pixels are checked before full verification
+MAX_PROBES = 6
+
+
+def _pack_pixels(arr):
+    """
+    Packs each pixel of an (H, W, C) uint8 array into one uint32 so a pixel
+    comparison is a single integer comparison.
+
+    Args:
+        arr: The numpy array to pack (3 or 4 channels).
+
+    Returns:
+        An (H, W) uint32 array.
+    """
+    packed = arr[:, :, 0].astype(np.uint32) << 16
+    packed |= arr[:, :, 1].astype(np.uint32) << 8
+    packed |= arr[:, :, 2]
+    if arr.shape[2] > 3:
+        packed |= arr[:, :, 3].astype(np.uint32) << 24
+    return packed
+
+
+def _choose_probes(packed_needle, max_probes=MAX_PROBES):
+    """
+    Picks the needle pixels used to prefilter candidate positions.
+    Colors that are rare within the needle are the most likely to be rare on
+    screen too, so one pixel of each of the rarest colors is chosen.
+
+    Args:
+        packed_needle: The (h, w) packed needle array.
+        max_probes: The maximum number of probe pixels to return.
+
+    Returns:
+        A list of (py, px, packed_color) tuples, most distinctive first.
+    """
+    flat = packed_needle.ravel()
+    colors, first_index, counts = np.unique(flat, return_index=True, return_counts=True)
+    order = np.argsort(counts, kind="stable")[:max_probes]
+
+    w = packed_needle.shape[1]
+    probes = []
+    for i in order:
+        py, px = divmod(int(first_index[i]), w)
+        probes.append((py, px, int(colors[i])))
+    return probes
+
+
+def _search(haystack_arr, packed_needle, probes):
+    """
+    Core search. Candidates come from one channel of the most distinctive
+    probe pixel, so no full-size temporary is built for the haystack; only
+    the survivors are packed and compared.
+
+    Args:
+        haystack_arr: The (H, W, C) haystack array.
+        packed_needle: The (h, w) packed needle.
+        probes: Probe pixels from _choose_probes.
+
+    Returns:
+        The (x, y) of the first match in row-major order, or None.
+    """
+    H, W, _ = haystack_arr.shape
+    h, w = packed_needle.shape
+    if h > H or w > W:
+        return None
+
+    span_y = H - h + 1
+    span_x = W - w + 1
+
+    # Candidates are offsets where one channel of the most distinctive pixel lines up
+    ay, ax, color = probes[0]
+    window = haystack_arr[ay:ay + span_y, ax:ax + span_x]
+    ys, xs = np.nonzero(window[:, :, 0] == ((color >> 16) & 0xFF))
+
+    # Narrow the survivors with the full color of every probe pixel
+    for py, px, color in probes:
+        if ys.size == 0:
+            return None
+        pixels = haystack_arr[ys + py, xs + px]
+        keep = _pack_pixels(pixels[np.newaxis])[0] == color
+        ys = ys[keep]
+        xs = xs[keep]
+
+    # np.nonzero yields row-major order, so the first verified hit is the same
+    # one the brute-force scan would have returned
+    for y, x in zip(ys.tolist(), xs.tolist()):
+        if np.array_equal(_pack_pixels(haystack_arr[y:y + h, x:x + w]), packed_needle):
+            return (x, y)
+    return None
+
+
+def find_exact_match(haystack_arr, needle_arr, return_position=False):
+    """
+    Searches a larger numpy array (haystack) for an exact match of a
+    smaller numpy array (needle).
+
+    Args:
+        haystack_arr: The numpy array of the screen region.
+        needle_arr: The numpy array of the template image to find.
+        return_position: If True, return the (x, y) position of the match.
+
+    Returns:
+        If return_position is False: True if an exact match is found, otherwise False.
+        If return_position is True: (x, y, width, height) tuple if found, otherwise None.
+    """
+    H, W, C = haystack_arr.shape
+    h, w, c = needle_arr.shape
+
+    # Check if needle is larger than haystack, or could never compare equal
+    if h > H or w > W or h == 0 or w == 0 or C != c:
+        return None if return_position else False
+
+    packed_needle = _pack_pixels(needle_arr)
+    match = _search(haystack_arr, packed_needle, _choose_probes(packed_needle))
+
+    if match is None:
+        return None if return_position else False
+    if return_position:
+        return (match[0], match[1], w, h)
+    return True
+
+
+class Template:
+    """
+    A decoded needle image plus the metadata the matcher needs, computed once.
+
+    Attributes:
+        path: The image file path.
+        mtime_ns: The file's modification time when it was decoded.
+        rgb: Contiguous (h, w, 3) uint8 RGB array.
+        packed: The (h, w) packed pixel array.
+        probes: Distinctive probe pixels; probes[0] is the anchor pixel.
+        digest: Hex digest of the pixel data, to tell templates apart in logs.
+    """
+
+    def __init__(self, path):
+        from PIL import Image
+
+        stat = os.stat(path)
+        with Image.open(path) as img:
+            # Convert to RGB to match the haystack format (discarding alpha)
+            rgb = np.ascontiguousarray(np.array(img.convert("RGB")))
+        rgb.setflags(write=False)
+
+        self.path = path
+        self.mtime_ns = stat.st_mtime_ns
+        self.rgb = rgb
+        self.packed = _pack_pixels(rgb)
+        self.probes = _choose_probes(self.packed)
+        self.digest = hashlib.blake2b(rgb.tobytes(), digest_size=8).hexdigest()
+
+    @property
+    def size(self):
+        """The (width, height) of the template."""
+        return (self.rgb.shape[1], self.rgb.shape[0])
+
+    @property
+    def anchor(self):
+        """The (x, y, (r, g, b)) of the most distinctive pixel."""
+        py, px, color = self.probes[0]
+        return (px, py, ((color >> 16) & 0xFF, (color >> 8) & 0xFF, color & 0xFF))
+
+
+class TemplateCache:
+    """
+    Decodes each template image once and keeps it for the life of the process.
+    An entry is only re-read from disk when the file's mtime changes.
+    """
+
+    def __init__(self):
+        self._entries = {}
+
+    def get(self, path):
+        """
+        Returns the Template for path, reloading it if the file changed on disk.
+
+        Raises:
+            FileNotFoundError: If the image does not exist.
+        """
+        entry = self._entries.get(path)
+        if entry is not None and os.stat(path).st_mtime_ns == entry.mtime_ns:
+            return entry
+        entry = Template(path)
+        self._entries[path] = entry
+        return entry
+
+    def preload(self, pattern="images/*.png"):
+        """Decodes every image matching a glob pattern. Returns the number loaded."""
+        paths = sorted(glob.glob(pattern))
+        for path in paths:
+            self.get(path)
+        return len(paths)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Shared cache used by the watcher scripts
+templates = TemplateCache()
+
+
+def find_template(haystack_arr, template, return_position=False):
+    """
+    Same as find_exact_match, but for a preloaded Template from TemplateCache.
+
+    Args:
+        haystack_arr: The RGB numpy array of the screen region.
+        template: A Template.
+        return_position: If True, return the (x, y) position of the match.
+
+    Returns:
+        If return_position is False: True if an exact match is found, otherwise False.
+        If return_position is True: (x, y, width, height) tuple if found, otherwise None.
+    """
+    H, W, C = haystack_arr.shape
+    h, w = template.packed.shape
+
+    if h > H or w > W or C != 3:
+        return None if return_position else False
+
+    match = _search(haystack_arr, template.packed, template.probes)
+
+    if match is None:
+        return None if return_position else False
+    if return_position:
+        return (match[0], match[1], w, h)
+    return True
+
+
+class LastPositionMatcher:
+    """
+    Template search with a fast path for templates that don't move.
+
+    Remembers where each template was last found in each search area and
+    checks that exact spot first (O(template size)), then a small
+    neighbourhood around it, and only falls back to the full search on a miss.
+    When a template occurs more than once, the fast path may return the
+    remembered occurrence rather than the first one in row-major order.
+
+    Attributes:
+        radius: How many pixels around the last position the neighbourhood covers.
+        hits: Searches answered by the exact last position.
+        near_hits: Searches answered by the neighbourhood.
+        misses: Searches that needed the full search (found or not).
+    """
+
+    def __init__(self, radius=8):
+        self.radius = radius
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self._last = {}  # (area, template path) -> (x, y)
+        self._recent = {}  # area -> path of the template matched most recently
+
+    def find(self, haystack_arr, template, area=None, return_position=False):
+        """
+        Same as find_template, using the remembered position when possible.
+
+        Args:
+            haystack_arr: The RGB numpy array of the screen region.
+            template: A Template.
+            area: Any hashable key for the search area (e.g. the region's
+                corners), so positions in different regions are kept apart.
+            return_position: If True, return the (x, y) position of the match.
+        """
+        H, W, C = haystack_arr.shape
+        h, w = template.packed.shape
+        if h > H or w > W or C != 3:
+            return None if return_position else False
+
+        key = (area, template.path)
+        match = None
+        last = self._last.get(key)
+        if last is not None:
+            x, y = last
+            if (y + h <= H and x + w <= W
+                    and np.array_equal(haystack_arr[y:y + h, x:x + w], template.rgb)):
+                self.hits += 1
+                match = last
+            else:
+                # Search just the neighbourhood around the last position
+                left, top = max(x - self.radius, 0), max(y - self.radius, 0)
+                window = haystack_arr[top:min(y + h + self.radius, H), left:min(x + w + self.radius, W)]
+                if window.shape[0] >= h and window.shape[1] >= w:
+                    near = _search(window, template.packed, template.probes)
+                    if near is not None:
+                        self.near_hits += 1
+                        match = (left + near[0], top + near[1])
+
+        if match is None:
+            self.misses += 1
+            match = _search(haystack_arr, template.packed, template.probes)
+
+        if match is None:
+            return None if return_position else False
+        self._last[key] = match
+        self._recent[area] = template.path
+        if return_position:
+            return (match[0], match[1], w, h)
+        return True
+
+    def recent(self, area=None):
+        """The path of the template matched most recently in this area, or None."""
+        return self._recent.get(area)
+
+    @property
+    def stats(self):
+        """Counters as a dict, plus the fraction of searches that took a fast path."""
+        total = self.hits + self.near_hits + self.misses
+        fast = (self.hits + self.near_hits) / total if total else 0.0
+        return {"hits": self.hits, "near_hits": self.near_hits, "misses": self.misses, "fast_ratio": fast}
+
+
+def find_exact_match_bruteforce(haystack_arr, needle_arr, return_position=False):
+    """
+    The original nested-loop search, kept as the reference for benchmarks.
+    Same arguments and return values as find_exact_match.
+    """
+    H, W, _ = haystack_arr.shape
+    h, w, _ = needle_arr.shape
+
+    if h > H or w > W:
+        return None if return_position else False
+
+    for y in range(H - h + 1):
+        for x in range(W - w + 1):
+            sub_array = haystack_arr[y : y + h, x : x + w]
+            if np.array_equal(sub_array, needle_arr):
+                if return_position:
+                    return (x, y, w, h)
+                return True
+
+    return None if return_position else False
+
+
+def _synthetic_screen(width, height, seed=0):
+    """Builds a desktop-like RGB frame: flat panels, text-ish noise and UI chrome."""
+    rng = np.random.default_rng(seed)
+    screen = np.full((height, width, 3), 255, dtype=np.uint8)
+    screen[:, : width // 6] = (225, 225, 225)  # folder pane
+    screen[: height // 20] = (0, 114, 198)  # ribbon
+    # Sprinkle rows of dark "text" pixels over the message list
+    for row in range(height // 10, height, 18):
+        cols = rng.integers(width // 6, width, size=width // 4)
+        screen[row:row + 8, cols] = rng.integers(0, 120, size=(8, cols.size, 3), dtype=np.uint8)
+    return screen
+
+
+def benchmark(needle_path, width, height, repeat, skip_bruteforce):
+    """Times both searches on a full-screen haystack with the needle near the bottom-right."""
+    from PIL import Image
+
+    needle = np.array(Image.open(needle_path).convert("RGB"))
+    haystack = _synthetic_screen(width, height)
+    h, w, _ = needle.shape
+    y, x = height - h - 7, width - w - 13
+    haystack[y:y + h, x:x + w] = needle
+
+    print(f"Haystack {width}x{height}, needle {needle_path} ({w}x{h}), match at ({x}, {y})")
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = find_exact_match(haystack, needle, return_position=True)
+    fast = (time.perf_counter() - start) / repeat
+    print(f"  vectorized:  {fast * 1000:9.2f} ms/search -> {result}")
+
+    if skip_bruteforce:
+        return
+
+    start = time.perf_counter()
+    reference = find_exact_match_bruteforce(haystack, needle, return_position=True)
+    slow = time.perf_counter() - start
+    print(f"  brute force: {slow * 1000:9.2f} ms/search -> {reference}")
+    print(f"  speedup: {slow / fast:.0f}x, results {'match' if result == reference else 'DIFFER'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exact-pixel template matching")
+    parser.add_argument("--bench", action="store_true", help="Benchmark against the brute-force loop")
+    parser.add_argument("--needle", default="images/outlook_logo.png", help="Template image to search for")
+    parser.add_argument("--width", type=int, default=2560, help="Haystack width (default 2560)")
+    parser.add_argument("--height", type=int, default=1440, help="Haystack height (default 1440)")
+    parser.add_argument("--repeat", type=int, default=20, help="Vectorized search repetitions (default 20)")
+    parser.add_argument("--skip-bruteforce", action="store_true",
+                        help="Only time the vectorized search (the loop takes many seconds)")
+    args = parser.parse_args()
+
+    if args.bench:
+        benchmark(args.needle, args.width, args.height, args.repeat, args.skip_bruteforce)
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Named screen regions for the blue watcher, saved to watch_regions.json so they
+survive restarts.
+
+Each WatchedRegion also carries its own detection state (last blue pixel
+count, change gate, inbox visibility), so one watcher process can follow any
+number of Outlook panes across monitors.
+
+Can be imported:
+    regions = load_regions()
+    regions.append(WatchedRegion("shared mailbox", (1930, 120), (2240, 900)))
+    save_regions(regions)
+"""
+
+import json
+import os
+
+from frame_gate import FrameGate
+
+REGIONS_FILE = "watch_regions.json"
+
+
+class WatchedRegion:
+    """
+    One watched rectangle and its per-region detection state.
+
+    Attributes:
+        name: Label used in the console output and the JSON file.
+        top_left: A 2-tuple (x, y) of the top-left screen coordinates.
+        bottom_right: A 2-tuple (x, y) of the bottom-right screen coordinates.
+        monitor_index: The mss monitor the region is on, or 0 if it spans
+            several (set by the watcher).
+    """
+
+    def __init__(self, name, top_left, bottom_right, monitor_index=None):
+        self.name = name
+        self.top_left = tuple(int(v) for v in top_left)
+        self.bottom_right = tuple(int(v) for v in bottom_right)
+        self.monitor_index = monitor_index
+
+        # Detection state, not persisted
+        self.gate = FrameGate()
+        self.old_count = None
+        self.inbox_found = True
+        self.has_unread = False
+        self.inbox_missing_since = None
+
+    def to_dict(self):
+        return {"name": self.name, "top_left": list(self.top_left), "bottom_right": list(self.bottom_right)}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["name"], data["top_left"], data["bottom_right"])
+
+    def __repr__(self):
+        return f"WatchedRegion({self.name!r}, {self.top_left}, {self.bottom_right})"
+
+
+def load_regions(path=REGIONS_FILE):
+    """Reads the saved regions. Returns an empty list if the file doesn't exist yet."""
+    if not os.path.exists(path):
+        return []
+    with open(path, "r") as f:
+        return [WatchedRegion.from_dict(item) for item in json.load(f)]
+
+
+def save_regions(regions, path=REGIONS_FILE):
+    """Writes the regions atomically, so a crash mid-write can't lose the old file."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump([region.to_dict() for region in regions], f, indent=2)
+    os.replace(tmp_path, path)